@@ -6,16 +6,72 @@ Fetches movies from TMDB API and creates an M3U playlist with vixsrc.to links
 
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 from datetime import datetime
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import time
 import json
 import hashlib
+import sqlite3
+from collections import defaultdict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import asyncio
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 # Load environment variables
 load_dotenv()
 
+# M3U entry templates, filled with format_map
+_EXTINF = '#EXTINF:-1 tvg-logo="{logo}" group-title="Film - {group}",{title} ({year})\n{url}\n\n'
+_EXTINF_TYPED = '#EXTINF:-1 type="movie" tvg-logo="{logo}" group-title="Film - {group}",{title} ({year})\n{url}\n'
+
+# HTTP status codes for which TMDB requests are retried
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Number of new movies written to the SQLite cache per transaction
+CACHE_BATCH_SIZE = 500
+
+# Maximum number of pending TMDB requests in the thread pool
+MAX_IN_FLIGHT = 256
+
+def _json_loads(data):
+    """Decode JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj):
+    """Encode an object as compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _write_file_bytes(path, data):
+    """Write a bytes buffer to path with raw os.write calls (no text-mode encoding layer)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 class TMDBM3UGenerator:
     def __init__(self):
         self.api_key = os.getenv('TMDB_API_KEY')
@@ -26,26 +82,57 @@ class TMDBM3UGenerator:
         # Definisce il percorso di base per i file di output (la cartella genitore dello script)
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.output_dir = os.path.dirname(script_dir)
-        self.cache_file = os.path.join(script_dir, "film_cache.json")
+        self.cache_file = os.path.join(script_dir, "film_cache.json")  # Old JSON cache, only used for the migration
+        self.cache_db = os.path.join(script_dir, "film_cache.sqlite")
+        self.conn = None  # Set by _load_cache; stays None if SQLite cannot be opened
+        self._pending_rows = []  # New movies not yet written to SQLite
+        self._new_cached = 0  # Movies added to the cache in this run
         self.cache = self._load_cache()
+        self.session = self._create_session()
         self.vixsrc_movies = self._load_vixsrc_movies()
+        self._genres = None  # TMDB genres, fetched only once
         
         if not self.api_key:
             raise ValueError("TMDB_API_KEY environment variable is required")
     
+    def _create_session(self):
+        """Create a shared HTTP session with keep-alive connection pooling"""
+        session = requests.Session()
+        # The pool must be at least as large as the maximum number of workers (50);
+        # with pool_block, extra workers wait for an already open connection
+        # instead of opening new ones that would then be discarded
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            pool_block=True,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=RETRY_STATUSES)
+        )
+        session.mount('https://', adapter)
+        # make_headers advertises gzip and deflate, plus br/zstd when their decoders are installed
+        session.headers.update(make_headers(accept_encoding=True, user_agent='TMDB-M3U-Generator/1.0'))
+        session.headers['Accept'] = 'application/json'
+        return session
+    
     def _load_vixsrc_movies(self):
         """Load available movies from vixsrc.to API"""
         try:
             print("Loading vixsrc.to movie list...")
-            response = requests.get(self.vixsrc_api, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract tmdb_ids from the response
-            vixsrc_ids = set()
-            for item in data:
-                if item.get('tmdb_id') and item['tmdb_id'] is not None:
-                    vixsrc_ids.add(str(item['tmdb_id']))
+            if ijson is not None:
+                # With ijson the list is streamed, one tmdb_id at a time
+                with self.session.get(self.vixsrc_api, timeout=10, stream=True) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    vixsrc_ids = {int(tmdb_id) for tmdb_id in ijson.items(response.raw, 'item.tmdb_id') if tmdb_id}
+            else:
+                response = self.session.get(self.vixsrc_api, timeout=10)
+                response.raise_for_status()
+                data = _json_loads(response.content)
+                
+                # Extract tmdb_ids from the response
+                vixsrc_ids = set()
+                for item in data:
+                    if item.get('tmdb_id') and item['tmdb_id'] is not None:
+                        vixsrc_ids.add(int(item['tmdb_id']))
             
             print(f"Loaded {len(vixsrc_ids)} available movies from vixsrc.to")
             return vixsrc_ids
@@ -56,29 +143,100 @@ class TMDBM3UGenerator:
     
     def _is_movie_available_on_vixsrc(self, tmdb_id):
         """Check if movie is available on vixsrc.to"""
-        return str(tmdb_id) in self.vixsrc_movies
+        return tmdb_id in self.vixsrc_movies
     
     def _load_cache(self):
-        """Load existing cache from file"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-                print(f"Loaded cache with {len(cache)} movies")
-                return cache
-            except Exception as e:
-                print(f"Error loading cache: {e}")
-        return {}
+        """Open the SQLite cache (migrating the old JSON cache if needed) and load it"""
+        cache = {}
+        try:
+            self.conn = sqlite3.connect(self.cache_db, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS movies ("
+                "id INTEGER PRIMARY KEY, title TEXT, release_date TEXT, vote_average REAL, "
+                "poster_path TEXT, genre_ids TEXT, cached_at TEXT)"
+            )
+            
+            if not self.conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone():
+                self._migrate_json_cache()
+            
+            for row in self.conn.execute(
+                "SELECT id, title, release_date, vote_average, poster_path, genre_ids, cached_at FROM movies"
+            ):
+                cache[str(row[0])] = {
+                    'id': row[0],
+                    'title': row[1],
+                    'release_date': row[2],
+                    'vote_average': row[3],
+                    'poster_path': row[4],
+                    'genre_ids': _json_loads(row[5]),
+                    'cached_at': row[6]
+                }
+            print(f"Loaded cache with {len(cache)} movies")
+        except Exception as e:
+            print(f"Error loading cache: {e}")
+        return cache
+    
+    def _migrate_json_cache(self):
+        """Import the old film_cache.json into the SQLite cache (one-time)"""
+        if not os.path.exists(self.cache_file):
+            return
+        with open(self.cache_file, 'rb') as f:
+            old_cache = _json_loads(f.read())
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO movies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._cache_row(movie) for movie in old_cache.values())
+            )
+        print(f"Migrated {len(old_cache)} movies from {os.path.basename(self.cache_file)} to SQLite")
+    
+    def _cache_row(self, movie):
+        """Convert a cached movie to a row of the movies table"""
+        return (
+            movie['id'],
+            movie['title'],
+            movie.get('release_date', ''),
+            movie.get('vote_average', 0),
+            movie.get('poster_path', ''),
+            _json_dumps(movie.get('genre_ids', [])).decode('utf-8'),
+            movie.get('cached_at', '')
+        )
+    
+    def _flush_cache(self):
+        """Write pending new movies to SQLite in a single transaction"""
+        if not self._pending_rows or self.conn is None:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR REPLACE INTO movies VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending_rows)
+        self._pending_rows = []
     
     def _save_cache(self):
-        """Save cache to file"""
+        """Save pending cache changes to SQLite (only new movies are written)"""
+        if not self._new_cached:
+            print(f"Cache unchanged ({len(self.cache)} movies), skipping save")
+            return
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-            print(f"Cache saved with {len(self.cache)} movies")
+            self._flush_cache()
+            print(f"Cache saved with {len(self.cache)} movies ({self._new_cached} new)")
         except Exception as e:
             print(f"Error saving cache: {e}")
     
+    def close_cache(self):
+        """Write pending changes and close the SQLite cache (also checkpoints the WAL file)"""
+        conn = getattr(self, 'conn', None)
+        if conn is None:
+            return
+        try:
+            self._flush_cache()
+        except Exception as e:
+            print(f"Error saving cache: {e}")
+        finally:
+            conn.close()
+            self.conn = None
+    
     def _get_cache_key(self, movie):
         """Generate cache key for a movie"""
         return str(movie['id'])
@@ -91,7 +249,7 @@ class TMDBM3UGenerator:
     def _add_to_cache(self, movie):
         """Add movie to cache"""
         cache_key = self._get_cache_key(movie)
-        self.cache[cache_key] = {
+        cached_movie = {
             'id': movie['id'],
             'title': movie['title'],
             'release_date': movie.get('release_date', ''),
@@ -100,6 +258,11 @@ class TMDBM3UGenerator:
             'genre_ids': movie.get('genre_ids', []),
             'cached_at': datetime.now().isoformat()
         }
+        self.cache[cache_key] = cached_movie
+        self._new_cached += 1
+        self._pending_rows.append(self._cache_row(cached_movie))
+        if len(self._pending_rows) >= CACHE_BATCH_SIZE:
+            self._flush_cache()
     
     def get_popular_movies(self, page=1, language='ro-RO'):
         """Fetch popular movies from TMDB"""
@@ -110,9 +273,9 @@ class TMDBM3UGenerator:
             'language': language
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def get_top_rated_movies(self, page=1, language='ro-RO'):
         """Fetch top rated movies from TMDB"""
@@ -123,9 +286,9 @@ class TMDBM3UGenerator:
             'language': language
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def get_all_movies(self, page=1, language='ro-RO'):
         """Fetch all movies from TMDB (discover endpoint)"""
@@ -139,21 +302,25 @@ class TMDBM3UGenerator:
             'include_video': False
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def get_movie_genres(self):
-        """Fetch movie genres from TMDB"""
+        """Fetch movie genres from TMDB (only once per run)"""
+        if self._genres is not None:
+            return self._genres
+        
         url = f"{self.base_url}/genre/movie/list"
         params = {
             'api_key': self.api_key,
             'language': 'ro-RO'
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
-        return {genre['id']: genre['name'] for genre in response.json()['genres']}
+        self._genres = {genre['id']: genre['name'] for genre in _json_loads(response.content)['genres']}
+        return self._genres
     
     def get_latest_movies(self, page=1, language='ro-RO'):
         """Fetch latest movies from TMDB"""
@@ -164,54 +331,51 @@ class TMDBM3UGenerator:
             'language': language
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def generate_m3u_playlist(self, movies_data, output_file="tmdb_movies.m3u"):
         """Generate M3U playlist from movies data"""
         # Get genres mapping
         genres = self.get_movie_genres()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            # Write M3U header
-            f.write("#EXTM3U\n")
-            f.write(f"# Generated by TMDB M3U Generator on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"# Total movies: {len(movies_data)}\n\n")
+        # Build the whole playlist in memory and write it with a single call
+        parts = [
+            "#EXTM3U\n",
+            f"# Generated by TMDB M3U Generator on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"# Total movies: {len(movies_data)}\n\n"
+        ]
+        
+        for movie in movies_data:
+            tmdb_id = movie['id']
+            title = movie['title']
+            year = movie.get('release_date', '')[:4] if movie.get('release_date') else ''
             
-            for movie in movies_data:
-                tmdb_id = movie['id']
-                title = movie['title']
-                year = movie.get('release_date', '')[:4] if movie.get('release_date') else ''
-                
-                # Get rating and create stars
-                rating = movie.get('vote_average', 0)
-                stars = "★" * int(rating / 2) + "☆" * (5 - int(rating / 2)) if rating > 0 else "☆☆☆☆☆"
-                
-                # Get all genres
-                genre_names = []
-                if movie.get('genre_ids') and movie['genre_ids']:
-                    for genre_id in movie['genre_ids']:
-                        genre_name = genres.get(genre_id, "")
-                        if genre_name:
-                            genre_names.append(genre_name)
-                
-                # Use first genre as primary, or "Film" if none
-                primary_genre = genre_names[0] if genre_names else "Film"
-                
-                # Get poster URL
-                poster_path = movie.get('poster_path', '')
-                tvg_logo = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
-                
-                # Create vixsrc.to link
-                movie_url = f"{self.vixsrc_base}/{tmdb_id}/?lang=ro"
-                
-                # Create title with stars and genres
-                display_title = f"{title} ({year})"
-                
-                # Write M3U entry with all metadata
-                f.write(f'#EXTINF:-1 type="movie" tvg-logo="{tvg_logo}" group-title="Film - {primary_genre}",{display_title}\n')
-                f.write(f"{movie_url}\n")
+            # Get all genres
+            genre_names = []
+            if movie.get('genre_ids') and movie['genre_ids']:
+                for genre_id in movie['genre_ids']:
+                    genre_name = genres.get(genre_id, "")
+                    if genre_name:
+                        genre_names.append(genre_name)
+            
+            # Use first genre as primary, or "Film" if none
+            primary_genre = genre_names[0] if genre_names else "Film"
+            
+            # Get poster URL
+            poster_path = movie.get('poster_path', '')
+            tvg_logo = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
+            
+            # Create vixsrc.to link
+            movie_url = f"{self.vixsrc_base}/{tmdb_id}/?lang=ro"
+            
+            # Write M3U entry with all metadata
+            parts.append(_EXTINF_TYPED.format_map({
+                'logo': tvg_logo, 'group': primary_genre, 'title': title, 'year': year, 'url': movie_url
+            }))
+        
+        _write_file_bytes(output_file, ''.join(parts).encode('utf-8'))
         
         print(f"Playlist generated successfully: {output_file}")
         print(f"Total movies: {len(movies_data)}")
@@ -252,14 +416,14 @@ class TMDBM3UGenerator:
         # Count total movies that will be added
         total_movies = len(movies_data)
         
+        # M3U header with movie count; the whole playlist is buffered and written once
+        parts = ["#EXTM3U\n", f"#PLAYLIST:Film VixSrc ({total_movies} Film)\n\n"]
+        
+        # Organize movies by categories
+        self._organize_and_write_movies(parts, movies_data, genres)
+        
         output_path = os.path.join(self.output_dir, "film.m3u")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Write M3U header with movie count
-            f.write("#EXTM3U\n")
-            f.write(f"#PLAYLIST:Film VixSrc ({total_movies} Film)\n\n")
-            
-            # Organize movies by categories
-            self._organize_and_write_movies(f, movies_data, genres)
+        _write_file_bytes(output_path, ''.join(parts).encode('utf-8'))
 
         # Save cache after completion
         self._save_cache()
@@ -284,31 +448,117 @@ class TMDBM3UGenerator:
         
         print(f"{len(movies_data)} movies loaded from cache, {len(to_fetch)} to fetch from TMDB...")
         
-        # Use ThreadPoolExecutor to fetch movie details in parallel
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            future_to_tmdb_id = {
-                executor.submit(self._fetch_movie_details, tmdb_id): tmdb_id 
-                for tmdb_id in to_fetch
-            }
-            completed = 0
-            for future in as_completed(future_to_tmdb_id):
-                tmdb_id = future_to_tmdb_id[future]
-                try:
-                    movie_data = future.result()
-                    if movie_data:
-                        movies_data.append(movie_data)
-                        # Add to cache
-                        if not self._is_movie_cached(movie_data):
-                            self._add_to_cache(movie_data)
-                    completed += 1
-                    if completed % 100 == 0:
-                        print(f"   Completed {completed}/{len(to_fetch)} TMDB requests...")
-                except Exception as e:
-                    print(f"   Error fetching movie {tmdb_id}: {e}")
+        # Everything is cached: no event loop or thread pool needed
+        if not to_fetch:
+            print(f"Successfully loaded {len(movies_data)} movie details (cache+TMDB)")
+            return movies_data
+        
+        # With aiohttp the requests run on a single event loop, otherwise on the thread pool
+        if aiohttp is not None:
+            fetched = asyncio.run(self._afetch_movie_details_batch(to_fetch))
+        else:
+            fetched = self._fetch_movie_details_batch(to_fetch)
+        
+        for movie_data in fetched:
+            if movie_data:
+                movies_data.append(movie_data)
+                # Add to cache
+                if not self._is_movie_cached(movie_data):
+                    self._add_to_cache(movie_data)
+        
+        # Keep only movies available on vixsrc.to, so writers need no per-entry check
+        available = self.vixsrc_movies
+        movies_data = [movie for movie in movies_data if movie['id'] in available]
         
         print(f"Successfully loaded {len(movies_data)} movie details (cache+TMDB)")
         return movies_data
     
+    def _fetch_movie_details_batch(self, to_fetch):
+        """Fetch movie details for many ids on a thread pool, returning them in completion order"""
+        # Keep at most MAX_IN_FLIGHT futures pending instead of submitting the whole list up front
+        results = []
+        pending_ids = iter(to_fetch)
+        future_to_tmdb_id = {}
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            while True:
+                for tmdb_id in pending_ids:
+                    future_to_tmdb_id[executor.submit(self._fetch_movie_details, tmdb_id)] = tmdb_id
+                    if len(future_to_tmdb_id) >= MAX_IN_FLIGHT:
+                        break
+                if not future_to_tmdb_id:
+                    break
+                
+                done, _ = wait(future_to_tmdb_id, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tmdb_id = future_to_tmdb_id.pop(future)
+                    try:
+                        results.append(future.result())
+                        if len(results) % 100 == 0:
+                            print(f"   Completed {len(results)}/{len(to_fetch)} TMDB requests...")
+                    except Exception as e:
+                        print(f"   Error fetching movie {tmdb_id}: {e}")
+        return results
+    
+    async def _afetch_movie_details_batch(self, to_fetch):
+        """Fetch movie details for many ids with aiohttp, returning them in completion order"""
+        results = []
+        pending_ids = iter(to_fetch)
+        in_flight = set()
+        connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+        # Same 5 s connect/read timeout as the sync requests
+        timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=5)
+        # Only encodings aiohttp can always decode; the requests session may also advertise br/zstd
+        headers = {
+            'User-Agent': self.session.headers['User-Agent'],
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate'
+        }
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as http:
+            while True:
+                for tmdb_id in pending_ids:
+                    in_flight.add(asyncio.ensure_future(self._afetch_movie_details(http, tmdb_id)))
+                    if len(in_flight) >= MAX_IN_FLIGHT:
+                        break
+                if not in_flight:
+                    break
+                
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results.append(task.result())
+                    if len(results) % 100 == 0:
+                        print(f"   Completed {len(results)}/{len(to_fetch)} TMDB requests...")
+        return results
+    
+    async def _afetch_movie_details(self, http, tmdb_id):
+        """Fetch movie details from TMDB by ID (async version of _fetch_movie_details)"""
+        url = f"{self.base_url}/movie/{tmdb_id}"
+        params = {
+            'api_key': self.api_key,
+            'language': 'ro-RO'
+        }
+        
+        # Same retries as the sync session's Retry: RETRY_STATUSES plus connection and read errors
+        for attempt in range(4):
+            try:
+                async with http.get(url, params=params) as response:
+                    if response.status in RETRY_STATUSES and attempt < 3:
+                        await asyncio.sleep(0.3 * (2 ** attempt))
+                        continue
+                    response.raise_for_status()
+                    return self._movie_from_details(_json_loads(await response.read()))
+            except aiohttp.ClientResponseError as e:
+                print(f"      Error fetching movie {tmdb_id}: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < 3:
+                    await asyncio.sleep(0.3 * (2 ** attempt))
+                    continue
+                print(f"      Error fetching movie {tmdb_id}: {e}")
+                return None
+            except Exception as e:
+                print(f"      Error fetching movie {tmdb_id}: {e}")
+                return None
+    
     def _fetch_movie_details(self, tmdb_id):
         """Fetch movie details from TMDB by ID"""
         url = f"{self.base_url}/movie/{tmdb_id}"
@@ -318,129 +568,129 @@ class TMDBM3UGenerator:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=5)
+            response = self.session.get(url, params=params, timeout=5)
             response.raise_for_status()
-            movie_data = response.json()
-            
-            # Convert to the format expected by the rest of the code
-            return {
-                'id': movie_data['id'],
-                'title': movie_data['title'],
-                'release_date': movie_data.get('release_date', ''),
-                'vote_average': movie_data.get('vote_average', 0),
-                'poster_path': movie_data.get('poster_path', ''),
-                'genre_ids': [genre['id'] for genre in movie_data.get('genres', [])]
-            }
+            return self._movie_from_details(_json_loads(response.content))
         except Exception as e:
             print(f"      Error fetching movie {tmdb_id}: {e}")
             return None
     
-    def _organize_and_write_movies(self, file, movies_data, genres):
-        """Organize movies by categories and write to file"""
+    def _movie_from_details(self, movie_data):
+        """Convert a TMDB movie details payload to the format expected by the rest of the code"""
+        return {
+            'id': movie_data['id'],
+            'title': movie_data['title'],
+            'release_date': movie_data.get('release_date', ''),
+            'vote_average': movie_data.get('vote_average', 0),
+            'poster_path': movie_data.get('poster_path', ''),
+            'genre_ids': [genre['id'] for genre in movie_data.get('genres', [])]
+        }
+    
+    def _organize_and_write_movies(self, parts, movies_data, genres):
+        """Organize movies by categories and append their M3U entries to parts"""
         # Get real category data from TMDB
         print("Fetching real category data from TMDB...")
         
-        # Get popular movies (real data)
-        popular_ids = set()
-        for page in range(1, 4):  # 3 pages for popular
-            try:
-                popular_data = self.get_popular_movies(page=page)
-                for movie in popular_data['results']:
-                    popular_ids.add(str(movie['id']))
-            except Exception as e:
-                print(f"Error fetching popular movies page {page}: {e}")
-        
-        # Get now playing movies (real data)
-        cinema_ids = set()
-        for page in range(1, 3):  # 2 pages for now playing
-            try:
-                cinema_data = self.get_latest_movies(page=page)
-                for movie in cinema_data['results']:
-                    cinema_ids.add(str(movie['id']))
-            except Exception as e:
-                print(f"Error fetching cinema movies page {page}: {e}")
-        
-        # Get top rated movies (real data)
-        latest_ids = set()
-        for page in range(1, 3):  # 2 pages for top rated
-            try:
-                latest_data = self.get_top_rated_movies(page=page)
-                for movie in latest_data['results']:
-                    latest_ids.add(str(movie['id']))
-            except Exception as e:
-                print(f"Error fetching top rated movies page {page}: {e}")
-        
-        # Group movies by real categories
-        cinema_movies = []
-        popular_movies = []
-        latest_movies = []
-        genre_movies = {genre_name: [] for genre_name in genres.values()}
+        # The 7 category pages are fetched in parallel on the same session
+        category_pages = [
+            ('popular', self.get_popular_movies, page) for page in range(1, 4)  # 3 pages for popular
+        ] + [
+            ('cinema', self.get_latest_movies, page) for page in range(1, 3)  # 2 pages for now playing
+        ] + [
+            ('latest', self.get_top_rated_movies, page) for page in range(1, 3)  # 2 pages for top rated
+        ]
+        category_labels = {'popular': 'popular', 'cinema': 'cinema', 'latest': 'top rated'}
+        category_ids = {'popular': set(), 'cinema': set(), 'latest': set()}
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            future_to_page = {
+                executor.submit(fetch, page=page): (category, page)
+                for category, fetch, page in category_pages
+            }
+            for future in as_completed(future_to_page):
+                category, page = future_to_page[future]
+                try:
+                    for movie in future.result()['results']:
+                        category_ids[category].add(movie['id'])
+                except Exception as e:
+                    print(f"Error fetching {category_labels[category]} movies page {page}: {e}")
         
-        # Process all movies
-        for movie in movies_data:
-            movie_id = str(movie['id'])
-            
-            # Add to appropriate categories based on real TMDB data
-            if movie_id in cinema_ids:
-                cinema_movies.append(movie)
-            if movie_id in popular_ids:
-                popular_movies.append(movie)
-            if movie_id in latest_ids:
-                latest_movies.append(movie)
-            
-            # Add to genre categories
-            for genre_id in movie['genre_ids']:
-                genre_name = genres.get(genre_id)
-                if genre_name:
-                    genre_movies[genre_name].append(movie)
+        # Build a column layout of the movies once, tagging categories and genres in the
+        # same pass; sections then hold row indices in the original movies_data order
+        cinema_rows, popular_rows, latest_rows, genre_to_rows = self._build_movie_columns(
+            movies_data, category_ids['cinema'], category_ids['popular'], category_ids['latest']
+        )
         
         # Write sections
         # 1. Film La Cinema (limit 50)
         print("\n1. Adding 'Film La Cinema' section...")
-        file.write("# La Cinema\n")
-        added_count = 0
-        for movie in cinema_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "La Cinema"):
-                added_count += 1
+        parts.append("# La Cinema\n")
+        added_count = self._append_movie_rows(parts, cinema_rows[:50], "La Cinema")
         print(f"   Added {added_count} movies to Al Cinema")
         
         # 2. Popolari (limit 50)
         print("\n2. Adding 'Populare' section...")
-        file.write("\n# Populare\n")
-        added_count = 0
-        for movie in popular_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "Populare"):
-                added_count += 1
+        parts.append("\n# Populare\n")
+        added_count = self._append_movie_rows(parts, popular_rows[:50], "Populare")
         print(f"   Added {added_count} movies to Popolari")
         
         # 3. Più Votati (limit 50)
         print("\n3. Adding 'Cele mai votate' section...")
-        file.write("\n# Cele mai votate\n")
-        added_count = 0
-        for movie in latest_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "Cele mai votate"):
-                added_count += 1
+        parts.append("\n# Cele mai votate\n")
+        added_count = self._append_movie_rows(parts, latest_rows[:50], "Cele mai votate")
         print(f"   Added {added_count} movies to Cele mai votate")
         
         # 4. Genres
         print("\n4. Adding genre-specific sections...")
-        for genre_name, movies in genre_movies.items():
-            if movies:  # Only add genres that have movies
-                print(f"   Adding '{genre_name}' section ({len(movies)} movies)...")
-                file.write(f"\n# {genre_name}\n")
+        release_dates = self._col_release_dates
+        for genre_id, genre_name in genres.items():
+            rows = genre_to_rows.get(genre_id)
+            if rows:  # Only add genres that have movies
+                print(f"   Adding '{genre_name}' section ({len(rows)} movies)...")
+                parts.append(f"\n# {genre_name}\n")
                 # Ordina i film dal più nuovo al più vecchio
-                movies_sorted = sorted(
-                    movies,
-                    key=lambda m: m.get('release_date', ''),
-                    reverse=True
-                )
-                added_count = 0
-                for movie in movies_sorted:
-                    if self._write_movie_entry(file, movie, genres, genre_name):
-                        added_count += 1
+                rows_sorted = sorted(rows, key=release_dates.__getitem__, reverse=True)
+                added_count = self._append_movie_rows(parts, rows_sorted, genre_name)
                 print(f"      Added {added_count} movies to {genre_name}")
     
-    def _create_playlist_from_cache(self, file, genres):
+    def _build_movie_columns(self, movies_data, cinema_ids, popular_ids, latest_ids):
+        """Store movie fields as parallel lists (one per field) indexed by row.
+        
+        Returns (cinema_rows, popular_rows, latest_rows, genre_to_rows): the rows
+        whose TMDB id is in each category set, and a map from genre id to the
+        list of rows tagged with that genre.
+        """
+        self._col_ids = ids = []
+        self._col_titles = titles = []
+        self._col_years = years = []
+        self._col_posters = posters = []
+        self._col_release_dates = release_dates = []
+        cinema_rows = []
+        popular_rows = []
+        latest_rows = []
+        genre_to_rows = defaultdict(list)
+        
+        for row, movie in enumerate(movies_data):
+            release_date = movie.get('release_date') or ''
+            genre_ids = movie.get('genre_ids') or []
+            ids.append(movie['id'])
+            titles.append(movie['title'])
+            years.append(release_date[:4])
+            posters.append(movie.get('poster_path', ''))
+            release_dates.append(release_date)
+            tmdb_id = movie['id']
+            if tmdb_id in cinema_ids:
+                cinema_rows.append(row)
+            if tmdb_id in popular_ids:
+                popular_rows.append(row)
+            if tmdb_id in latest_ids:
+                latest_rows.append(row)
+            for genre_id in genre_ids:
+                genre_to_rows[genre_id].append(row)
+        
+        return cinema_rows, popular_rows, latest_rows, genre_to_rows
+    
+    def _create_playlist_from_cache(self, parts, genres):
         """Create playlist using only cached movies"""
         print(f"Creating playlist from {len(self.cache)} cached movies...")
         
@@ -448,7 +698,7 @@ class TMDBM3UGenerator:
         cinema_movies = []
         popular_movies = []
         latest_movies = []
-        genre_movies = {genre_name: [] for genre_name in genres.values()}
+        genre_movies = defaultdict(list)  # Only genres that have movies get a list
         
         # Process all cached movies
         for movie_data in self.cache.values():
@@ -471,44 +721,50 @@ class TMDBM3UGenerator:
             
             # Add to genre categories
             for genre_id in movie_data['genre_ids']:
-                genre_name = genres.get(genre_id)
-                if genre_name:
-                    genre_movies[genre_name].append(movie)
+                if genres.get(genre_id):
+                    genre_movies[genre_id].append(movie)
         
         # Write sections
         # 1. Film Al Cinema (limit 50)
         print("\n1. Adding 'Film La Cinema' section...")
-        file.write("# La Cinema\n")
+        parts.append("# La Cinema\n")
         added_count = 0
         for movie in cinema_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "La Cinema"):
+            entry = self._write_movie_entry(movie, genres, "La Cinema")
+            if entry:
+                parts.append(entry)
                 added_count += 1
         print(f"   Added {added_count} movies to La Cinema")
         
         # 2. Popolari (limit 50)
         print("\n2. Adding 'Populare' section...")
-        file.write("\n# Populare\n")
+        parts.append("\n# Populare\n")
         added_count = 0
         for movie in popular_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "Populare"):
+            entry = self._write_movie_entry(movie, genres, "Populare")
+            if entry:
+                parts.append(entry)
                 added_count += 1
         print(f"   Added {added_count} movies to Populare")
         
         # 3. Più Votati (limit 50)
         print("\n3. Adding 'Cele mai votate' section...")
-        file.write("\n# Cele mai votate\n")
+        parts.append("\n# Cele mai votate\n")
         added_count = 0
         for movie in latest_movies[:50]:
-            if self._write_movie_entry(file, movie, genres, "Cele mai votate"):
+            entry = self._write_movie_entry(movie, genres, "Cele mai votate")
+            if entry:
+                parts.append(entry)
                 added_count += 1
         print(f"   Added {added_count} movies to Cele mai votate")
         
         # 4. Genres
         print("\n4. Adding genre-specific sections...")
-        for genre_name, movies in genre_movies.items():
+        for genre_id, genre_name in genres.items():
+            movies = genre_movies.get(genre_id)
             if movies:  # Only add genres that have movies
                 print(f"   Adding '{genre_name}' section ({len(movies)} movies)...")
-                file.write(f"\n# {genre_name}\n")
+                parts.append(f"\n# {genre_name}\n")
                 # Ordina i film dal più nuovo al più vecchio
                 movies_sorted = sorted(
                     movies,
@@ -517,7 +773,9 @@ class TMDBM3UGenerator:
                 )
                 added_count = 0
                 for movie in movies_sorted:
-                    if self._write_movie_entry(file, movie, genres, genre_name):
+                    entry = self._write_movie_entry(movie, genres, genre_name)
+                    if entry:
+                        parts.append(entry)
                         added_count += 1
                 print(f"      Added {added_count} movies to {genre_name}")
     
@@ -526,13 +784,13 @@ class TMDBM3UGenerator:
         print(f"   Fetching {endpoint} movies (max {max_pages} pages, limit: {limit})...")
         
         # First, get the total number of pages
-        first_response = requests.get(f"{self.base_url}/movie/{endpoint}", params={
+        first_response = self.session.get(f"{self.base_url}/movie/{endpoint}", params={
             'api_key': self.api_key,
             'page': 1,
             'language': 'ro-RO'
         })
         first_response.raise_for_status()
-        first_data = first_response.json()
+        first_data = _json_loads(first_response.content)
         total_pages = min(first_data['total_pages'], max_pages)
         
         print(f"   Total pages to fetch: {total_pages}")
@@ -588,23 +846,16 @@ class TMDBM3UGenerator:
             'language': 'ro-RO'
         }
         
-        # Optimized request settings
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'TMDB-M3U-Generator/1.0',
-            'Accept': 'application/json'
-        })
-        
-        response = session.get(url, params=params, timeout=5)
+        response = self.session.get(url, params=params, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
         
         return data['results']
     
     def _get_all_movies_by_genre(self, genre_id, max_pages=500):
         """Get all movies for a specific genre using multithreading and cache"""
         # First, get the total number of pages
-        first_response = requests.get(f"{self.base_url}/discover/movie", params={
+        first_response = self.session.get(f"{self.base_url}/discover/movie", params={
             'api_key': self.api_key,
             'page': 1,
             'language': 'ro-RO',
@@ -614,7 +865,7 @@ class TMDBM3UGenerator:
             'with_genres': genre_id
         })
         first_response.raise_for_status()
-        first_data = first_response.json()
+        first_data = _json_loads(first_response.content)
         total_pages = min(first_data['total_pages'], max_pages)
         
         # Use ThreadPoolExecutor to fetch pages in parallel
@@ -667,42 +918,23 @@ class TMDBM3UGenerator:
             'with_genres': genre_id
         }
         
-        # Optimized request settings
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'TMDB-M3U-Generator/1.0',
-            'Accept': 'application/json'
-        })
-        
-        response = session.get(url, params=params, timeout=5)
+        response = self.session.get(url, params=params, timeout=5)
         response.raise_for_status()
-        data = response.json()
+        data = _json_loads(response.content)
         
         return data['results']
     
-    def _write_movie_entry(self, file, movie, genres, group_title):
-        """Write a single movie entry to the M3U file"""
+    def _write_movie_entry(self, movie, genres, group_title):
+        """Build a single movie M3U entry, or None if the movie is not on vixsrc.to"""
         tmdb_id = movie['id']
         
         # Check if movie is available on vixsrc.to
         if not self._is_movie_available_on_vixsrc(tmdb_id):
-            return False  # Skip this movie
+            return None  # Skip this movie
         
         title = movie['title']
         year = movie.get('release_date', '')[:4] if movie.get('release_date') else ''
         
-        # Get rating and create stars
-        rating = movie.get('vote_average', 0)
-        stars = "★" * int(rating / 2) + "☆" * (5 - int(rating / 2)) if rating > 0 else "☆☆☆☆☆"
-        
-        # Get all genres
-        genre_names = []
-        if movie.get('genre_ids') and movie['genre_ids']:
-            for genre_id in movie['genre_ids']:
-                genre_name = genres.get(genre_id, "")
-                if genre_name:
-                    genre_names.append(genre_name)
-        
         # Get poster URL
         poster_path = movie.get('poster_path', '')
         tvg_logo = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else ""
@@ -710,15 +942,33 @@ class TMDBM3UGenerator:
         # Create vixsrc.to link
         movie_url = f"{self.vixsrc_base}/{tmdb_id}/?lang=it"
         
-        # Create title with stars and genres
-        display_title = f"{title} ({year})"
-        
-        # Write M3U entry
-        file.write(f'#EXTINF:-1 tvg-logo="{tvg_logo}" group-title="Film - {group_title}",{display_title}\n')
-        file.write(f"{movie_url}\n\n")
-        return True  # Movie was added
+        # Build M3U entry
+        return _EXTINF.format_map({
+            'logo': tvg_logo, 'group': group_title, 'title': title, 'year': year, 'url': movie_url
+        })
     
-
+    def _append_movie_rows(self, parts, rows, group_title):
+        """Append the M3U entries of the given rows of the column layout; returns how many were added"""
+        # Availability on vixsrc.to is already filtered in _get_movies_from_vixsrc_list.
+        # Columns, template and methods bound to locals: this is the hottest loop in the script
+        ids = self._col_ids
+        titles = self._col_titles
+        years = self._col_years
+        posters = self._col_posters
+        vixsrc_base = self.vixsrc_base
+        fill = _EXTINF.format_map
+        append = parts.append
+        
+        for row in rows:
+            poster_path = posters[row]
+            append(fill({
+                'logo': f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "",
+                'group': group_title,
+                'title': titles[row],
+                'year': years[row],
+                'url': f"{vixsrc_base}/{ids[row]}/?lang=it"
+            }))
+        return len(rows)
     
     def create_all_movies_playlist(self, pages=50, output_file="tmdb_movies.m3u"):
         """Create playlist with all available movies"""
@@ -748,6 +998,7 @@ class TMDBM3UGenerator:
 
 def main():
     """Main function to run the generator"""
+    generator = None
     try:
         generator = TMDBM3UGenerator()
         
@@ -766,6 +1017,10 @@ def main():
         print("\nMake sure to set your TMDB_API_KEY environment variable:")
         print("1. Get your API key from https://www.themoviedb.org/settings/api")
         print("2. Create a .env file with: TMDB_API_KEY=your_api_key_here")
+    finally:
+        # Movies fetched before a failure are still written, and the WAL is checkpointed
+        if generator is not None:
+            generator.close_cache()
 
 if __name__ == "__main__":
     main() 
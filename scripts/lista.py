@@ -1,19 +1,310 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import re
+import time
+import threading
 import concurrent.futures
 import json
+import functools
+import urllib.parse
+import operator
+import hashlib
+import io
+import unicodedata
 import xml.etree.ElementTree as ET
 from collections import defaultdict
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+# Variabili d'ambiente lette una sola volta all'avvio
+NOMEREPO = os.getenv("NOMEREPO", "").strip()
+NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
+CANALI_DADDY = os.getenv("CANALI_DADDY", "no").strip().lower() == "si"
+LINK_DADDY = os.getenv("LINK_DADDY", "").strip() or "https://dlhd.dad"
+
+# Sessione HTTP condivisa: riusa le connessioni (TCP+TLS) tra download e ricerche Bing diversi.
+# pool_maxsize copre le ricerche loghi in parallelo (LOGO_SEARCH_WORKERS eventi, due squadre ciascuno)
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3))
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
+# URL dei loghi combinati gia' calcolati in questa esecuzione, per coppia di squadre (con un lock per coppia)
+_LOGO_URL_CACHE = {}
+_LOGO_KEY_LOCKS = {}
+# Ricerche loghi eventi in parallelo: quasi tutto il tempo è attesa di rete verso Bing
+LOGO_SEARCH_WORKERS = 16
+
 # Definisce il percorso della cartella dello script e della cartella principale
 script_dir = os.path.dirname(os.path.abspath(__file__))
 output_dir = os.path.dirname(script_dir)
 
+# Espressioni regolari precompilate, usate nei cicli su canali ed eventi
+_EXTINF_NAME_RE = re.compile(r',(.+)')
+_EXTINF_SPLIT_RE = re.compile(r'(?m)^(?=[^\S\n]*#EXTINF:)')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_TIME_SUFFIX_RE = re.compile(r'\s*\(\d{1,2}:\d{2}\)\s*$')
+_CHANNEL_ID_RE = re.compile(r'id=(\d+)')
+_CHANNEL_SUFFIX_RE = re.compile(r'\s*\.(a|b|c|s|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|t|u|v|w|x|y|z)\s*$', re.IGNORECASE)
+_DOT_IT_RE = re.compile(r"\.it\b")
+_HD_RE = re.compile(r"hd|fullhd")
+_EVENT_TIME_RE = re.compile(r'(2[0-3]|[01]\d|\d):([0-5]\d|\d)')
+_VS_SPLIT_RE = re.compile(r'\s+vs\.?\s+', re.IGNORECASE)
+_ORDINAL_SUFFIX_RE = re.compile(r'(\d+)(?:st|nd|rd|th)\b')
+
+class _TvgIdTable(dict):
+    """Tabella per str.translate che tiene solo a-z, A-Z, 0-9 e À-ÿ (come [^a-zA-Z0-9À-ÿ] rimosso con re.sub).
+    Riempita man mano: ogni carattere viene classificato una volta sola, senza costruire la tabella per tutto l'Unicode"""
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        keep = ('a' <= char <= 'z') or ('A' <= char <= 'Z') or ('0' <= char <= '9') or ('À' <= char <= 'ÿ')
+        self[codepoint] = codepoint if keep else None
+        return self[codepoint]
+
+_TVG_ID_TABLE = _TvgIdTable()
+
+# Parole chiave dei canali da tenere negli eventi (mondo / solo Italia), come parole intere.
+# "tennis channel" e "tennis stream" restano fuori: il vecchio confronto parola per parola non poteva mai trovarle
+_CHANNEL_KEYWORDS_WORLD_RE = re.compile(r'\b(?:italy|rai|italia|it|uk|tnt|usa|la)\b')
+_CHANNEL_KEYWORDS_IT_RE = re.compile(r'\b(?:italy|rai|italia|it)\b')
+
+@functools.lru_cache(maxsize=4096)
+def channel_matches(channel_name, world=False):
+    """True se il nome del canale contiene una delle parole chiave (memorizzato: i canali si ripetono tra gli eventi)"""
+    keywords_re = _CHANNEL_KEYWORDS_WORLD_RE if world else _CHANNEL_KEYWORDS_IT_RE
+    return keywords_re.search(channel_name.lower()) is not None
+
+# Pattern per estrarre gli URL delle immagini dalle pagine di Bing Immagini, in ordine di preferenza.
+# Ogni pattern è accoppiato a un letterale che deve comparire nella pagina perché possa trovare qualcosa:
+# se il letterale manca (ricerca di sottostringa, velocissima) il regex non viene nemmeno eseguito
+_BING_MURL_PATTERNS = [(literal, re.compile(p)) for literal, p in (
+    ('murl&quot;:&quot;', r'murl&quot;:&quot;(https?://[^&]+)&quot;'),
+    ('"murl":"', r'"murl":"(https?://[^"]+)"'),
+    ('"contentUrl":"', r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"'),
+    ('class="mimg"', r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"'),
+    ('class="iusc"', r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'),
+)]
+_BING_IG_JSON_RE = re.compile(r'var\s+IG\s*=\s*(\{.+?\});\s*')
+_JSON_KEY_FIX_RE = re.compile(r'([{,])\s*([a-zA-Z0-9_]+):')
+_ANY_IMG_RE = re.compile(r'(https?://[^"\']+\.(?:png|jpg|jpeg|svg|webp))')
+
+# Header "da browser" per le pagine di ricerca di Bing
+_BING_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Cache-Control": "max-age=0",
+    "Connection": "keep-alive"
+}
+
+# Testi presenti solo nelle pagine di Bing senza risultati, e lunghezza minima di una pagina di risultati valida
+_BING_NO_RESULTS_MARKERS = ('sb_no_results', 'no_results_displayed', 'Nessun risultato pertinente')
+_BING_MIN_PAGE_LENGTH = 1000
+# I risultati immagine stanno all'inizio della pagina: oltre questa soglia il resto non viene analizzato
+_BING_MAX_PAGE_BYTES = 256 * 1024
+# Richieste contemporanee verso Bing: i thread dei loghi possono essere molti più di così,
+# ma oltre questa soglia Bing inizia a limitare (pagine vuote o verifiche anti-bot)
+BING_MAX_CONCURRENT = 8
+_BING_SEMAPHORE = threading.BoundedSemaphore(BING_MAX_CONCURRENT)
+
+_BING_URL_TPL = "https://www.bing.com/images/search?q={}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
+
+@functools.lru_cache(maxsize=1024)
+def bing_image_search_url(query):
+    """URL di ricerca Bing Immagini per la query; memorizzato perché le stesse query (prefissi, squadre) si ripetono"""
+    return _BING_URL_TPL.format(urllib.parse.quote(query))
+
+def _json_loads(data):
+    """Decodifica JSON (str o bytes), con orjson se disponibile"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj, indent=False):
+    """Codifica JSON in bytes UTF-8, con orjson se disponibile (indent: rientro di 2 spazi)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+def parse_bing_ig_json(json_str):
+    """Decodifica il blocco 'var IG = {...}' di Bing.
+
+    Di solito è già JSON valido; solo se non lo è si aggiungono le virgolette alle chiavi con il regex."""
+    try:
+        return _json_loads(json_str)
+    except ValueError:
+        return _json_loads(_JSON_KEY_FIX_RE.sub(r'\1"\2":', json_str))
+
+def fetch_bing_page(search_url):
+    """Scarica la pagina di Bing Immagini e ne restituisce solo i primi _BING_MAX_PAGE_BYTES come testo,
+    o None se Bing non risponde 200 (gli errori di rete si propagano)"""
+    with _BING_SEMAPHORE:
+        response = _SESSION.get(search_url, headers=_BING_HEADERS, timeout=10)
+    if response.status_code != 200:
+        return None
+    # Il corpo viene comunque letto tutto, così la connessione torna nel pool keep-alive;
+    # decodifica e regex lavorano però solo sull'inizio della pagina.
+    # Il taglio può spezzare un carattere multibyte: errors='replace' lo sostituisce invece di fallire
+    return response.content[:_BING_MAX_PAGE_BYTES].decode('utf-8', errors='replace')
+
+def find_bing_image_url(html):
+    """Restituisce l'URL immagine migliore della pagina di Bing, o None.
+
+    Vince il primo pattern (in ordine di preferenza) che ha risultati; tra i suoi risultati
+    si preferisce il primo PNG o SVG, altrimenti il primo trovato."""
+    # Pattern separati e non un'unica alternanza: ognuno inizia con un letterale che il motore re
+    # cerca velocemente, mentre l'alternanza scandisce la pagina carattere per carattere (più lenta)
+    for literal, pattern in _BING_MURL_PATTERNS:
+        if literal not in html:
+            continue
+        # finditer invece di findall: ci si ferma al primo PNG/SVG senza costruire la lista dei risultati
+        first_url = None
+        for match in pattern.finditer(html):
+            url = match.group(1)
+            url_lower = url.lower()
+            if '.png' in url_lower or '.svg' in url_lower:
+                return url
+            if first_url is None:
+                first_url = url
+        if first_url is not None:
+            return first_url
+    return None
+
+# Cache su disco delle ricerche loghi su Bing (squadre, prefissi, eventi): chiave -> {"url": URL o None, "ts": timestamp}.
+# Un URL nullo è un risultato negativo: Bing ha risposto ma senza loghi validi
+_TEAM_LOGO_CACHE_FILE = os.path.join(script_dir, "logos_cache.json")
+_TEAM_LOGO_HIT_TTL = 7 * 24 * 3600
+_TEAM_LOGO_MISS_TTL = 24 * 3600
+_TEAM_LOGO_LOCK = threading.Lock()
+_TEAM_LOGO_KEY_LOCKS = {}
+
+def _team_logo_entry_ttl(entry):
+    return _TEAM_LOGO_HIT_TTL if entry['url'] else _TEAM_LOGO_MISS_TTL
+
+def _load_team_logo_cache():
+    """Carica la cache dei loghi scartando le voci scadute, che verrebbero comunque ricercate:
+    così il file (salvato nel repository a ogni esecuzione) non cresce all'infinito"""
+    try:
+        with open(_TEAM_LOGO_CACHE_FILE, 'rb') as f:
+            cache = _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    # Il file è nel repository e può essere modificato a mano: una cache malformata
+    # viene ignorata invece di interrompere tutto lo script all'import
+    if not isinstance(cache, dict):
+        print(f"[!] Cache dei loghi non valida, verrà ricreata: {_TEAM_LOGO_CACHE_FILE}")
+        return {}
+    now = time.time()
+    try:
+        return {key: entry for key, entry in cache.items()
+                if isinstance(entry, dict) and 'ts' in entry and 'url' in entry
+                and now - entry['ts'] <= _team_logo_entry_ttl(entry)}
+    except (TypeError, ValueError) as e:
+        print(f"[!] Cache dei loghi non valida, verrà ricreata: {e}")
+        return {}
+
+_TEAM_LOGO_CACHE = _load_team_logo_cache()
+
+# True se la cache dei loghi contiene voci nuove non ancora salvate su disco
+_TEAM_LOGO_DIRTY = False
+
+def _save_team_logo_cache():
+    """Scrive la cache dei loghi in modo atomico (file temporaneo + os.replace). Da chiamare con il lock."""
+    tmp_path = _TEAM_LOGO_CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_json_dumps(_TEAM_LOGO_CACHE))
+        os.replace(tmp_path, _TEAM_LOGO_CACHE_FILE)
+    except OSError as e:
+        print(f"[!] Impossibile salvare la cache dei loghi: {e}")
+
+def save_team_logo_cache():
+    """Salva la cache dei loghi su disco, solo se ci sono voci nuove.
+    Chiamata una volta alla fine di ogni generatore, invece che a ogni ricerca"""
+    global _TEAM_LOGO_DIRTY
+    with _TEAM_LOGO_LOCK:
+        if _TEAM_LOGO_DIRTY:
+            _save_team_logo_cache()
+            _TEAM_LOGO_DIRTY = False
+
+def cached_logo_search(name, search, kind=""):
+    """Restituisce il logo per name dalla cache su disco, altrimenti lo cerca con search(name).
+
+    kind separa nella cache i tipi di ricerca diversi (squadre senza prefisso, "prefisso", "evento").
+    search deve restituire l'URL trovato, "" se la ricerca è andata a buon fine senza risultati
+    oppure None in caso di errore (gli errori non vengono memorizzati).
+    Le voci nuove restano in memoria fino a save_team_logo_cache()."""
+    global _TEAM_LOGO_DIRTY
+    key = name.lower().strip()
+    if kind:
+        key = f"{kind}:{key}"
+    # Lock per chiave: se più eventi in parallelo cercano la stessa squadra (o prefisso),
+    # gli altri aspettano la prima ricerca e poi la trovano in cache
+    with _TEAM_LOGO_KEY_LOCKS.setdefault(key, threading.Lock()):
+        entry = _TEAM_LOGO_CACHE.get(key)
+        if entry is not None:
+            if time.time() - entry['ts'] <= _team_logo_entry_ttl(entry):
+                return entry['url']
+
+        logo_url = search(name)
+        if logo_url is None:
+            return None
+        with _TEAM_LOGO_LOCK:
+            _TEAM_LOGO_CACHE[key] = {'url': logo_url or None, 'ts': time.time()}
+            _TEAM_LOGO_DIRTY = True
+    return logo_url or None
+
+# Loghi fissi per squadra (nome normalizzato -> URL), controllati prima della cache e di Bing.
+# File opzionale, da popolare a mano (anche copiando gli URL già risolti in logos_cache.json)
+_STATIC_TEAM_LOGOS_FILE = os.path.join(script_dir, "teams_logos.json")
+
+def normalize_team_name(name):
+    """Nome della squadra in minuscolo e senza accenti, usato come chiave di teams_logos.json"""
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower().strip()
+
+def _load_static_team_logos():
+    try:
+        with open(_STATIC_TEAM_LOGOS_FILE, 'rb') as f:
+            data = _json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    return {normalize_team_name(name): url for name, url in data.items() if url}
+
+_STATIC_TEAM_LOGOS = _load_static_team_logos()
+
+def event_time_minutes(time_str):
+    """Minuti dalla mezzanotte di un orario "HH:MM" (stessi formati accettati da strptime con "%H:%M").
+    Solleva ValueError se l'orario non è valido"""
+    match = _EVENT_TIME_RE.fullmatch(time_str)
+    if not match:
+        raise ValueError(f"time data {time_str!r} does not match format '%H:%M'")
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+# Formati delle date dello schedule ("Saturday 15th Nov 2025", dopo aver tolto il suffisso ordinale)
+_SCHEDULE_DATE_FORMATS = ("%A %d %b %Y", "%A %d %B %Y")
+
+@functools.lru_cache(maxsize=64)
+def parse_schedule_date(date_part):
+    """Data (date) di una chiave dello schedule. Prova prima strptime sui formati noti,
+    poi dateutil in modalità fuzzy come prima. Solleva un'eccezione se la data non è riconoscibile"""
+    normalized = _ORDINAL_SUFFIX_RE.sub(r'\1', date_part).strip()
+    for date_format in _SCHEDULE_DATE_FORMATS:
+        try:
+            return datetime.strptime(normalized, date_format).date()
+        except ValueError:
+            pass
+    from dateutil import parser
+    return parser.parse(date_part, fuzzy=True).date()
+
 def headers_to_extvlcopt(headers):
     """Converte un dizionario di header in una lista di stringhe #EXTVLCOPT per VLC."""
     vlc_opts = []
@@ -22,50 +313,55 @@ def headers_to_extvlcopt(headers):
         vlc_opts.append(f'#EXTVLCOPT:http-{key.lower()}={value}')
     return vlc_opts
 
+def parse_m3u_for_sorting(file_path):
+    """Legge un file M3U e restituisce una lista di tuple (nome_canale, righe_canale)"""
+    channels = []
+    if not os.path.exists(file_path):
+        print(f"[AVVISO] File non trovato, impossibile ordinarlo: {file_path}")
+        return channels
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+
+    # Il regex spezza il file in blocchi che iniziano ciascuno con una riga #EXTINF:
+    # il primo pezzo (intestazione #EXTM3U ed eventuali righe prima del primo canale) viene scartato
+    for block in _EXTINF_SPLIT_RE.split(text)[1:]:
+        # Un canale può avere più righe (es. #EXTVLCOPT)
+        channel_block = [line.strip() for line in block.split('\n')]
+        if block.endswith('\n'):
+            channel_block.pop()
+        channel_name_match = _EXTINF_NAME_RE.search(channel_block[0])
+        channel_name = channel_name_match.group(1).strip() if channel_name_match else "SenzaNome"
+        channels.append((channel_name, channel_block))
+    return channels
+
+# Funzione per scaricare o leggere una playlist
+def download_playlist(source, append_params=False, exclude_group_title=None):
+    if source.startswith("http"):
+        response = _SESSION.get(source, timeout=30)
+        response.raise_for_status()
+        playlist = response.text
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            playlist = f.read()
+    
+    # Rimuovi intestazione iniziale ed eventuale gruppo escluso in un solo passaggio.
+    # split('\n') e non splitlines(), per non spezzare righe su altri separatori Unicode
+    if exclude_group_title:
+        lines = [line for line in playlist.split('\n')
+                 if not line.startswith('#EXTM3U') and exclude_group_title not in line]
+    else:
+        lines = [line for line in playlist.split('\n') if not line.startswith('#EXTM3U')]
+
+    return '\n'.join(lines)
+
 def merger_playlist():
     # Codice del primo script qui
     # Aggiungi il codice del tuo script "merger_playlist.py" in questa funzione.
     # Ad esempio:
     print("Eseguendo il merger_playlist.py...")
-    import requests
     import os
-    from dotenv import load_dotenv
-    import re
 
-    def parse_m3u_for_sorting(file_path):
-        """Legge un file M3U e restituisce una lista di tuple (nome_canale, righe_canale)"""
-        channels = []
-        if not os.path.exists(file_path):
-            print(f"[AVVISO] File non trovato, impossibile ordinarlo: {file_path}")
-            return channels
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith('#EXTINF:'):
-                channel_name_match = re.search(r',(.+)', line)
-                channel_name = channel_name_match.group(1).strip() if channel_name_match else "SenzaNome"
-                
-                # Un canale può avere più righe (es. #EXTVLCOPT)
-                channel_block = [line]
-                i += 1
-                while i < len(lines) and not lines[i].strip().startswith('#EXTINF:'):
-                    channel_block.append(lines[i].strip())
-                    i += 1
-                channels.append((channel_name, channel_block))
-            else:
-                i += 1
-        return channels
-        
-    # Carica le variabili d'ambiente dal file .env
-    load_dotenv()
-
-    NOMEREPO = os.getenv("NOMEREPO", "").strip()
-    NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-    
     # Percorsi o URL delle playlist M3U8
     url_vavoo = os.path.join(output_dir, "vavoo.m3u")
     url_dlhd = os.path.join(output_dir, "dlhd.m3u")
@@ -73,59 +369,52 @@ def merger_playlist():
     url_sportsonline = os.path.join(output_dir, "sportsonline.m3u")
     url6 = "https://raw.githubusercontent.com/Brenders/Pluto-TV-Italia-M3U/main/PlutoItaly.m3u"
     
-    # Funzione per scaricare o leggere una playlist
-    def download_playlist(source, append_params=False, exclude_group_title=None):
-        if source.startswith("http"):
-            response = requests.get(source, timeout=30)
-            response.raise_for_status()
-            playlist = response.text
-        else:
-            with open(source, 'r', encoding='utf-8') as f:
-                playlist = f.read()
-        
-        # Rimuovi intestazione iniziale
-        playlist = '\n'.join(line for line in playlist.split('\n') if not line.startswith('#EXTM3U'))
-    
-        if exclude_group_title:
-            playlist = '\n'.join(line for line in playlist.split('\n') if exclude_group_title not in line)
-    
-        return playlist
-    
     # 1. Unisci e ordina i canali italiani (Vavoo e Daddylive)
     print("Unione e ordinamento dei canali italiani (Vavoo, Daddylive)...")
     vavoo_channels = parse_m3u_for_sorting(url_vavoo)
     dlhd_channels = parse_m3u_for_sorting(url_dlhd)
     
-    all_italian_channels = vavoo_channels + dlhd_channels 
-    all_italian_channels.sort(key=lambda x: x[0].lower())
+    # Chiave di ordinamento calcolata una volta per canale (casefold gestisce anche ß e simili);
+    # itemgetter confronta solo la chiave, quindi l'ordinamento resta stabile
+    all_italian_channels = [(name.casefold(), channel_block) for name, channel_block in vavoo_channels]
+    # I canali Daddylive con lo stesso nome di un canale Vavoo sono doppioni: vince Vavoo
+    vavoo_names = {key for key, _ in all_italian_channels}
+    all_italian_channels += [(key, channel_block) for key, channel_block in
+                             ((name.casefold(), channel_block) for name, channel_block in dlhd_channels)
+                             if key not in vavoo_names]
+    all_italian_channels.sort(key=operator.itemgetter(0))
     
-    sorted_italian_playlist = ""
-    for _, channel_block in all_italian_channels:
-        sorted_italian_playlist += "\n".join(channel_block) + "\n"
+    # Blocchi raccolti in una lista e uniti una sola volta (niente += su stringhe lunghe)
+    italian_parts = ["\n".join(channel_block) for _, channel_block in all_italian_channels]
+    sorted_italian_playlist = "\n".join(italian_parts) + "\n" if italian_parts else ""
 
     # 2. Scarica le altre playlist
     print("Download delle altre playlist...")
     
-    canali_daddy_flag = os.getenv("CANALI_DADDY", "no").strip().lower()
-    if canali_daddy_flag == "si":
-        playlist_eventi = download_playlist(url_eventi, append_params=True)
-    else:
-        print("[INFO] Skipping eventi_dlhd.m3u8 in merger_playlist as CANALI_DADDY is not 'si'.")
-        playlist_eventi = ""
-
-    playlist_sportsonline = download_playlist(url_sportsonline)
-    playlist_pluto = download_playlist(url6)
+    # Le playlist vengono scaricate/lette in parallelo
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        if CANALI_DADDY:
+            future_eventi = executor.submit(download_playlist, url_eventi, append_params=True)
+        else:
+            print("[INFO] Skipping eventi_dlhd.m3u8 in merger_playlist as CANALI_DADDY is not 'si'.")
+            future_eventi = None
+        future_sportsonline = executor.submit(download_playlist, url_sportsonline)
+        future_pluto = executor.submit(download_playlist, url6)
+
+        playlist_eventi = future_eventi.result() if future_eventi is not None else ""
+        playlist_sportsonline = future_sportsonline.result()
+        playlist_pluto = future_pluto.result()
     
     # 3. Unisci tutte le playlist (con i canali italiani ordinati all'inizio)
-    lista = sorted_italian_playlist + "\n" + playlist_eventi + "\n" + playlist_sportsonline + "\n" + playlist_pluto
-    
-    # Aggiungi intestazione EPG
-    lista = f'#EXTM3U url-tvg="https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/refs/heads/main/epg.xml"\n' + lista
+    # L'intestazione EPG va in testa; tutto viene unito con un solo join
+    header = f'#EXTM3U url-tvg="https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/refs/heads/main/epg.xml"'
+    lista = "\n".join([header, sorted_italian_playlist, playlist_eventi, playlist_sportsonline, playlist_pluto])
     
     # Salva la playlist
     output_filename = os.path.join(output_dir, "lista.m3u")
-    with open(output_filename, 'w', encoding='utf-8') as file:
-        file.write(lista)
+    # Codifica una sola volta e scrive in binario, senza il livello di codifica dei file di testo
+    with open(output_filename, 'wb') as file:
+        file.write(lista.encode('utf-8'))
     
     print(f"Playlist combinata salvata in: {output_filename}")
     
@@ -135,44 +424,8 @@ def merger_playlistworld():
     # Aggiungi il codice del tuo script "merger_playlist.py" in questa funzione.
     # Ad esempio:
     print("Eseguendo il merger_playlistworld.py...")
-    import requests
     import os
-    from dotenv import load_dotenv
-    import re
 
-    def parse_m3u_for_sorting(file_path):
-        """Legge un file M3U e restituisce una lista di tuple (nome_canale, righe_canale)"""
-        channels = []
-        if not os.path.exists(file_path):
-            print(f"[AVVISO] File non trovato, impossibile ordinarlo: {file_path}")
-            return channels
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if line.startswith('#EXTINF:'):
-                channel_name_match = re.search(r',(.+)', line)
-                channel_name = channel_name_match.group(1).strip() if channel_name_match else "SenzaNome"
-                
-                channel_block = [line]
-                i += 1
-                while i < len(lines) and not lines[i].strip().startswith('#EXTINF:'):
-                    channel_block.append(lines[i].strip())
-                    i += 1
-                channels.append((channel_name, channel_block))
-            else:
-                i += 1
-        return channels
-        
-    # Carica le variabili d'ambiente dal file .env
-    load_dotenv()
-
-    NOMEREPO = os.getenv("NOMEREPO", "").strip()
-    NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-    
     # Percorsi o URL delle playlist M3U8
     url_vavoo = os.path.join(output_dir, "vavoo.m3u")
     url_dlhd = os.path.join(output_dir, "dlhd.m3u")
@@ -181,59 +434,53 @@ def merger_playlistworld():
     url5 = "https://raw.githubusercontent.com/Brenders/Pluto-TV-Italia-M3U/main/PlutoItaly.m3u"
     url_world = os.path.join(output_dir, "world.m3u")
     
-    # Funzione per scaricare o leggere una playlist
-    def download_playlist(source, append_params=False, exclude_group_title=None):
-        if source.startswith("http"):
-            response = requests.get(source, timeout=30)
-            response.raise_for_status()
-            playlist = response.text
-        else:
-            with open(source, 'r', encoding='utf-8') as f:
-                playlist = f.read()
-        
-        # Rimuovi intestazione iniziale
-        playlist = '\n'.join(line for line in playlist.split('\n') if not line.startswith('#EXTM3U'))
-    
-        if exclude_group_title:
-            playlist = '\n'.join(line for line in playlist.split('\n') if exclude_group_title not in line)
-    
-        return playlist
-    
     # 1. Unisci e ordina i canali italiani (Vavoo e Daddylive)
     print("Unione e ordinamento dei canali italiani (Vavoo, Daddylive)...")
     vavoo_channels = parse_m3u_for_sorting(url_vavoo)
     dlhd_channels = parse_m3u_for_sorting(url_dlhd)
     
-    all_italian_channels = vavoo_channels + dlhd_channels
-    all_italian_channels.sort(key=lambda x: x[0].lower())
+    # Chiave di ordinamento calcolata una volta per canale (casefold gestisce anche ß e simili);
+    # itemgetter confronta solo la chiave, quindi l'ordinamento resta stabile
+    all_italian_channels = [(name.casefold(), channel_block) for name, channel_block in vavoo_channels]
+    # I canali Daddylive con lo stesso nome di un canale Vavoo sono doppioni: vince Vavoo
+    vavoo_names = {key for key, _ in all_italian_channels}
+    all_italian_channels += [(key, channel_block) for key, channel_block in
+                             ((name.casefold(), channel_block) for name, channel_block in dlhd_channels)
+                             if key not in vavoo_names]
+    all_italian_channels.sort(key=operator.itemgetter(0))
     
-    sorted_italian_playlist = ""
-    for _, channel_block in all_italian_channels:
-        sorted_italian_playlist += "\n".join(channel_block) + "\n"
+    # Blocchi raccolti in una lista e uniti una sola volta (niente += su stringhe lunghe)
+    italian_parts = ["\n".join(channel_block) for _, channel_block in all_italian_channels]
+    sorted_italian_playlist = "\n".join(italian_parts) + "\n" if italian_parts else ""
 
     # 2. Scarica le altre playlist
     print("Download delle altre playlist...")
     
-    canali_daddy_flag = os.getenv("CANALI_DADDY", "no").strip().lower()
-    if canali_daddy_flag == "si":
-        playlist_eventi = download_playlist(url_eventi, append_params=True)
-    else:
-        print("[INFO] Skipping eventi_dlhd.m3u8 in merger_playlistworld as CANALI_DADDY is not 'si'.")
-        playlist_eventi = ""
-
-    playlist_sportsonline = download_playlist(url_sportsonline)
-    playlist_pluto = download_playlist(url5)
-    playlist_world = download_playlist(url_world, exclude_group_title="Italy")
+    # Le playlist vengono scaricate/lette in parallelo
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        if CANALI_DADDY:
+            future_eventi = executor.submit(download_playlist, url_eventi, append_params=True)
+        else:
+            print("[INFO] Skipping eventi_dlhd.m3u8 in merger_playlistworld as CANALI_DADDY is not 'si'.")
+            future_eventi = None
+        future_sportsonline = executor.submit(download_playlist, url_sportsonline)
+        future_pluto = executor.submit(download_playlist, url5)
+        future_world = executor.submit(download_playlist, url_world, exclude_group_title="Italy")
+
+        playlist_eventi = future_eventi.result() if future_eventi is not None else ""
+        playlist_sportsonline = future_sportsonline.result()
+        playlist_pluto = future_pluto.result()
+        playlist_world = future_world.result()
     # 3. Unisci tutte le playlist
-    lista = sorted_italian_playlist + "\n" + playlist_eventi + "\n" + playlist_sportsonline + "\n" + playlist_pluto + "\n" + playlist_world
-    
-    # Aggiungi intestazione EPG
-    lista = f'#EXTM3U url-tvg="https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/refs/heads/main/epg.xml"\n' + lista
+    # L'intestazione EPG va in testa; tutto viene unito con un solo join
+    header = f'#EXTM3U url-tvg="https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/refs/heads/main/epg.xml"'
+    lista = "\n".join([header, sorted_italian_playlist, playlist_eventi, playlist_sportsonline, playlist_pluto, playlist_world])
     
     # Salva la playlist
     output_filename = os.path.join(output_dir, "lista.m3u")
-    with open(output_filename, 'w', encoding='utf-8') as file:
-        file.write(lista)
+    # Codifica una sola volta e scrive in binario, senza il livello di codifica dei file di testo
+    with open(output_filename, 'wb') as file:
+        file.write(lista.encode('utf-8'))
     
     print(f"Playlist combinata salvata in: {output_filename}")
 
@@ -272,48 +519,66 @@ def epg_merger():
     path_eventi_dlhd = os.path.join(output_dir, 'eventi_dlhd.xml')
 
     def download_and_parse_xml(url):
-        """Scarica un file .xml o .gzip e restituisce l'ElementTree."""
+        """Scarica un file .xml o .gzip e restituisce la lista degli elementi figli della radice.
+
+        Il file viene letto in streaming con iterparse: né il contenuto scaricato
+        né quello decompresso vengono tenuti interi in memoria."""
         try:
             # Aggiunto verify=False per ignorare gli errori SSL
-            response = requests.get(url, timeout=30, verify=False)
-            response.raise_for_status()
-
-            # Prova a decomprimere come GZIP
-            try:
-                with gzip.open(io.BytesIO(response.content), 'rb') as f_in:
-                    xml_content = f_in.read()
-            except (gzip.BadGzipFile, OSError):
-                # Non Ã¨ un file gzip, usa direttamente il contenuto
-                xml_content = response.content
-
-            return ET.ElementTree(ET.fromstring(xml_content))
+            with _SESSION.get(url, timeout=30, verify=False, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                stream = io.BufferedReader(response.raw)
+
+                # Se inizia con la firma GZIP decomprime al volo, altrimenti usa direttamente il contenuto
+                if stream.peek(2)[:2] == b'\x1f\x8b':
+                    stream = gzip.GzipFile(fileobj=stream)
+
+                elements = []
+                depth = 0
+                for event, elem in ET.iterparse(stream, events=('start', 'end')):
+                    if event == 'start':
+                        if depth == 0:
+                            root = elem
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 1:
+                            elements.append(elem)
+                            # Stacca subito l'elemento dalla radice sorgente
+                            root.clear()
+                return elements
         except requests.exceptions.RequestException as e:
             print(f"Errore durante il download da {url} (verifica SSL disabilitata): {e}")
         except ET.ParseError as e:
             print(f"Errore nel parsing del file XML da {url}: {e}")
+        except (requests.packages.urllib3.exceptions.HTTPError, OSError, EOFError) as e:
+            # Errori durante la lettura in streaming o GZIP corrotto
+            print(f"Errore durante la lettura da {url}: {e}")
         return None
 
     # Creare un unico XML vuoto
     root_finale = ET.Element('tv')
-    tree_finale = ET.ElementTree(root_finale)
+
+    # Scaricare tutte le sorgenti (compreso it.xml) in parallelo;
+    # map restituisce i risultati nello stesso ordine degli URL
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(urls_gzip) + 1) as executor:
+        sources = list(executor.map(download_and_parse_xml, urls_gzip + [url_it]))
+    elements_it = sources.pop()
 
     # Processare ogni URL
-    for url in urls_gzip:
-        tree = download_and_parse_xml(url)
-        if tree is not None:
-            root = tree.getroot()
-            for element in root:
-                root_finale.append(element)
+    for elements in sources:
+        if elements is not None:
+            root_finale.extend(elements)
 
     # Check CANALI_DADDY flag before processing eventi_dlhd.xml
-    canali_daddy_flag = os.getenv("CANALI_DADDY", "no").strip().lower()
-    if canali_daddy_flag == "si":
+    if CANALI_DADDY:
         # Aggiungere eventi_dlhd.xml da file locale
         if os.path.exists(path_eventi_dlhd):
             try:
                 tree_eventi_dlhd = ET.parse(path_eventi_dlhd)
                 root_eventi_dlhd = tree_eventi_dlhd.getroot()
-                for programme in root_eventi_dlhd.findall(".//programme"):
+                for programme in root_eventi_dlhd.iter('programme'):
                     root_finale.append(programme)
             except ET.ParseError as e:
                 print(f"Errore nel parsing del file eventi_dlhd.xml: {e}")
@@ -322,12 +587,11 @@ def epg_merger():
     else:
         print("[INFO] Skipping eventi_dlhd.xml in epg_merger as CANALI_DADDY is not 'si'.")
 
-    # Aggiungere it.xml da URL remoto
-    tree_it = download_and_parse_xml(url_it)
-    if tree_it is not None:
-        root_it = tree_it.getroot()
-        for programme in root_it.findall(".//programme"):
-            root_finale.append(programme)
+    # Aggiungere it.xml da URL remoto (già scaricato sopra)
+    if elements_it is not None:
+        for element in elements_it:
+            if element.tag == 'programme':
+                root_finale.append(element)
     else:
         print(f"Impossibile scaricare o analizzare il file it.xml da {url_it}")
 
@@ -338,609 +602,517 @@ def epg_merger():
             new_value = old_value.replace(" ", "").lower()
             element.attrib[attr_name] = new_value
 
-    # Pulire gli ID dei canali
-    for channel in root_finale.findall(".//channel"):
-        clean_attribute(channel, 'id')
+    # Pulire gli ID dei canali e gli attributi 'channel' nei programmi in un solo passaggio
+    for element in root_finale.iter():
+        tag = element.tag
+        if tag == 'channel':
+            clean_attribute(element, 'id')
+        elif tag == 'programme':
+            clean_attribute(element, 'channel')
 
-    # Pulire gli attributi 'channel' nei programmi
-    for programme in root_finale.findall(".//programme"):
-        clean_attribute(programme, 'channel')
+    # Serializzare l'albero una sola volta: gli stessi byte vanno nel file XML e nel GZIP
+    xml_bytes = ET.tostring(root_finale, encoding='utf-8', xml_declaration=True)
 
     # Salvare il file XML finale
     with open(output_xml, 'wb') as f_out:
-        tree_finale.write(f_out, encoding='utf-8', xml_declaration=True)
+        f_out.write(xml_bytes)
     print(f"File XML salvato: {output_xml}")
 
     # Salvare anche il file GZIP
     output_gz = os.path.join(output_dir, 'epg.xml.gz')
-    with gzip.open(output_gz, 'wb') as f_gz:
-        tree_finale.write(f_gz, encoding='utf-8', xml_declaration=True)
+    # GzipFile con filename: l'intestazione conserva il nome originale "epg.xml", come con gzip.open
+    with open(output_gz, 'wb') as f_gz:
+        with gzip.GzipFile(filename='epg.xml', mode='wb', fileobj=f_gz, compresslevel=6) as gz:
+            gz.write(xml_bytes)
     print(f"File GZIP salvato: {output_gz}")
              
-# Funzione per il terzo script (eventi_dlhd_m3u8_generator.py)
-def eventi_dlhd_m3u8_generator_world():
-    # Codice del terzo script qui
-    # Aggiungi il codice del tuo script "eventi_dlhd_m3u8_generator.py" in questa funzione.
-    print("Eseguendo l'eventi_dlhd_m3u8_generator.py...")
-    # Il codice che avevi nello script "eventi_dlhd_m3u8_generator.py" va qui, senza modifiche.
-    import json
-    import re
-    import requests
-    import urllib.parse # Consolidato
-    from datetime import datetime, timedelta
-    from dateutil import parser
-    import os
-    from dotenv import load_dotenv
-    from PIL import Image, ImageDraw, ImageFont
-    import io # Aggiunto per encoding URL
-    import time
-    
-    # Carica le variabili d'ambiente dal file .env
-    load_dotenv()
+# Loghi degli eventi DLHD, comuni ai due generatori eventi_dlhd: ricerca su Bing (con cache),
+# immagini "VS" per le partite e file combinati nella cartella logos.
+# Le immagini combinate più recenti di così vengono riutilizzate senza rigenerarle
+_COMBINED_LOGO_MAX_AGE = 3 * 60 * 60
 
-    LINK_DADDY = os.getenv("LINK_DADDY", "").strip() or "https://dlhd.dad"
-    JSON_FILE = os.path.join(script_dir, "daddyliveSchedule.json")
-    OUTPUT_FILE = os.path.join(output_dir, "eventi_dlhd.m3u")
-    HEADERS = { 
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36" 
-    } 
-     
-    HTTP_TIMEOUT = 10 
-    session = requests.Session() 
-    session.headers.update(HEADERS) 
-    # Definisci current_time e three_hours_in_seconds per la logica di caching
-    current_time = time.time()
-    three_hours_in_seconds = 3 * 60 * 60
-    
-    def clean_category_name(name): 
-        # Rimuove tag html come </span> o simili 
-        return re.sub(r'<[^>]+>', '', name).strip()
-        
-    def clean_tvg_id(tvg_id):
-        """
-        Pulisce il tvg-id rimuovendo caratteri speciali, spazi e convertendo tutto in minuscolo
-        """
-        # import re # 're' Ã¨ giÃ  importato a livello di funzione
-        # Rimuove caratteri speciali comuni mantenendo solo lettere e numeri
-        cleaned = re.sub(r'[^a-zA-Z0-9À-ÿ]', '', tvg_id)
-        return cleaned.lower()
-     
-    def search_logo_for_event(event_name): 
-        """ 
-        Cerca un logo per l'evento specificato utilizzando un motore di ricerca 
-        Restituisce l'URL dell'immagine trovata o None se non trovata 
-        """ 
-        try: 
-            # Rimuovi eventuali riferimenti all'orario dal nome dell'evento
-            # Cerca pattern come "Team A vs Team B (20:00)" e rimuovi la parte dell'orario
-            clean_event_name = re.sub(r'\s*\(\d{1,2}:\d{2}\)\s*$', '', event_name)
-            # Se c'ÃÂ¨ un ':', prendi solo la parte dopo
-            if ':' in clean_event_name:
-                clean_event_name = clean_event_name.split(':', 1)[1].strip()
-            
-            # Verifica se l'evento contiene "vs" o "-" per identificare le due squadre
-            teams = None
-            if " vs " in clean_event_name:
-                teams = clean_event_name.split(" vs ")
-            elif " VS " in clean_event_name:
-                teams = clean_event_name.split(" VS ")
-            elif " VS. " in clean_event_name:
-                teams = clean_event_name.split(" VS. ")
-            elif " vs. " in clean_event_name:
-                teams = clean_event_name.split(" vs. ")
-            
-            # Se abbiamo identificato due squadre, cerchiamo i loghi separatamente
-            if teams and len(teams) == 2:
-                team1 = teams[0].strip()
-                team2 = teams[1].strip()
-                
-                print(f"[🔍] Ricerca logo per Team 1: {team1}")
-                logo1_url = search_team_logo(team1)
-                
-                print(f"[🔍] Ricerca logo per Team 2: {team2}")
-                logo2_url = search_team_logo(team2)
-                
-                # Se abbiamo trovato entrambi i loghi, creiamo un'immagine combinata
-                if logo1_url and logo2_url:
-                    # Scarica i loghi e l'immagine VS
-                    try:
-                        from os.path import exists, getmtime
-                        
-                        # Crea la cartella logos se non esiste
-                        logos_dir = os.path.join(output_dir, "logos")
-                        os.makedirs(logos_dir, exist_ok=True)
-                        
-                        # Verifica se l'immagine combinata esiste giÃÂ  e non ÃÂ¨ obsoleta
-                        relative_logo_path = os.path.join("logos", f"{team1}_vs_{team2}.png")
-                        absolute_output_filename = os.path.join(output_dir, relative_logo_path)
-                        if exists(absolute_output_filename):
-                            file_age = current_time - os.path.getmtime(absolute_output_filename)
-                            if file_age <= three_hours_in_seconds:
-                                print(f"[✓] Utilizzo immagine combinata esistente: {absolute_output_filename}")
-                                
-                                # Carica le variabili d'ambiente per GitHub
-                                NOMEREPO = os.getenv("NOMEREPO", "").strip()
-                                NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-                                
-                                # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
-                                if NOMEGITHUB and NOMEREPO:
-                                    github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
-                                    print(f"[✓] URL GitHub generato per logo esistente: {github_raw_url}")
-                                    return github_raw_url
-                                else:
-                                    # Altrimenti restituisci il percorso locale
-                                    return absolute_output_filename
-                        
-                        # Scarica i loghi
-                        img1, img2 = None, None
-                        
-                        if logo1_url:
-                            try:
-                                # Aggiungi un User-Agent simile a un browser
-                                logo_headers = {
-                                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                                }
-                                response1 = requests.get(logo1_url, headers=logo_headers, timeout=10)
-                                response1.raise_for_status() # Controlla errori HTTP
-                                if 'image' in response1.headers.get('Content-Type', '').lower():
-                                    img1 = Image.open(io.BytesIO(response1.content))
-                                    print(f"[✓] Logo1 scaricato con successo da: {logo1_url}")
-                                else:
-                                    print(f"[!] URL logo1 ({logo1_url}) non è un'immagine (Content-Type: {response1.headers.get('Content-Type')}).")
-                                    logo1_url = None # Invalida URL se non è un'immagine
-                            except requests.exceptions.RequestException as e_req:
-                                print(f"[!] Errore scaricando logo1 ({logo1_url}): {e_req}")
-                                logo1_url = None
-                            except Exception as e_pil: # Errore specifico da PIL durante Image.open
-                                print(f"[!] Errore PIL aprendo logo1 ({logo1_url}): {e_pil}")
-                                logo1_url = None
-                        
-                        if logo2_url:
-                            try:
-                                # Aggiungi un User-Agent simile a un browser
-                                logo_headers = {
-                                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                                }
-                                response2 = requests.get(logo2_url, headers=logo_headers, timeout=10)
-                                response2.raise_for_status() # Controlla errori HTTP
-                                if 'image' in response2.headers.get('Content-Type', '').lower():
-                                    img2 = Image.open(io.BytesIO(response2.content))
-                                    print(f"[✓] Logo2 scaricato con successo da: {logo2_url}")
-                                else:
-                                    print(f"[!] URL logo2 ({logo2_url}) non è un'immagine (Content-Type: {response2.headers.get('Content-Type')}).")
-                                    logo2_url = None # Invalida URL se non è un'immagine
-                            except requests.exceptions.RequestException as e_req:
-                                print(f"[!] Errore scaricando logo2 ({logo2_url}): {e_req}")
-                                logo2_url = None
-                            except Exception as e_pil: # Errore specifico da PIL durante Image.open
-                                print(f"[!] Errore PIL aprendo logo2 ({logo2_url}): {e_pil}")
-                                logo2_url = None
-                        
-                        # Carica l'immagine VS (assicurati che esista nella directory corrente)
-                        vs_path = os.path.join(script_dir, "vs.png")
-                        if exists(vs_path):
-                            img_vs = Image.open(vs_path)
-                            # Converti l'immagine VS in modalitÃÂ  RGBA se non lo ÃÂ¨ giÃÂ 
-                            if img_vs.mode != 'RGBA':
-                                img_vs = img_vs.convert('RGBA')
-                        else:
-                            # Crea un'immagine di testo "VS" se il file non esiste
-                            img_vs = Image.new('RGBA', (100, 100), (255, 255, 255, 0))
-                            from PIL import ImageDraw, ImageFont
-                            draw = ImageDraw.Draw(img_vs)
-                            try:
-                                font = ImageFont.truetype("arial.ttf", 40)
-                            except:
-                                font = ImageFont.load_default()
-                            draw.text((30, 30), "VS", fill=(255, 0, 0), font=font)
-                        
-                        # Procedi con la combinazione solo se entrambi i loghi sono stati caricati con successo
-                        if not (img1 and img2):
-                            print(f"[!] Impossibile caricare entrambi i loghi come immagini valide per la combinazione. Logo1 caricato: {bool(img1)}, Logo2 caricato: {bool(img2)}.")
-                            raise ValueError("Uno o entrambi i loghi non sono stati caricati correttamente.") # Questo forzerÃ  l'except sottostante
-                        
-                        # Ridimensiona le immagini a dimensioni uniformi
-                        size = (150, 150)
-                        img1 = img1.resize(size)
-                        img2 = img2.resize(size)
-                        img_vs = img_vs.resize((100, 100))
-                        
-                        # Assicurati che tutte le immagini siano in modalitÃÂ  RGBA per supportare la trasparenza
-                        if img1.mode != 'RGBA':
-                            img1 = img1.convert('RGBA')
-                        if img2.mode != 'RGBA':
-                            img2 = img2.convert('RGBA')
-                        
-                        # Crea una nuova immagine con spazio per entrambi i loghi e il VS
-                        combined_width = 300
-                        combined = Image.new('RGBA', (combined_width, 150), (255, 255, 255, 0))
-                        
-                        # Posiziona le immagini con il VS sovrapposto al centro
-                        # Posiziona il primo logo a sinistra
-                        combined.paste(img1, (0, 0), img1)
-                        # Posiziona il secondo logo a destra
-                        combined.paste(img2, (combined_width - 150, 0), img2)
-                        
-                        # Posiziona il VS al centro, sovrapposto ai due loghi
-                        vs_x = (combined_width - 100) // 2
-                        
-                        # Crea una copia dell'immagine combinata prima di sovrapporre il VS
-                        # Questo passaggio ÃÂ¨ importante per preservare i dettagli dei loghi sottostanti
-                        combined_with_vs = combined.copy()
-                        combined_with_vs.paste(img_vs, (vs_x, 25), img_vs)
-                        
-                        # Usa l'immagine con VS sovrapposto
-                        combined = combined_with_vs
-                        
-                        # Salva l'immagine combinata
-                        combined.save(absolute_output_filename)
-                        
-                        print(f"[✓] Immagine combinata creata: {absolute_output_filename}")
-                        
-                        # Carica le variabili d'ambiente per GitHub
-                        NOMEREPO = os.getenv("NOMEREPO", "").strip()
-                        NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-                        
-                        # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
-                        if NOMEGITHUB and NOMEREPO:
-                            github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
-                            print(f"[✓] URL GitHub generato: {github_raw_url}")
-                            return github_raw_url
-                        else:
-                            # Altrimenti restituisci il percorso assoluto
-                            return absolute_output_filename
-                        
-                    except Exception as e:
-                        print(f"[!] Errore nella creazione dell'immagine combinata: {e}")
-                        # Se fallisce, restituisci solo il primo logo trovato
-                        return logo1_url or logo2_url
-                
-                # Se non abbiamo trovato entrambi i loghi, restituisci quello che abbiamo
-                return logo1_url or logo2_url
-            if ':' in event_name:
-                # Usa la parte prima dei ":" per la ricerca
-                prefix_name = event_name.split(':', 1)[0].strip()
-                print(f"[🔍] Tentativo ricerca logo con prefisso: {prefix_name}")
-                
-                # Prepara la query di ricerca con il prefisso
-                search_query = urllib.parse.quote(f"{prefix_name} logo")
-                
-                # Utilizziamo l'API di Bing Image Search con parametri migliorati
-                search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-                
-                headers = { 
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                    "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                    "Cache-Control": "max-age=0",
-                    "Connection": "keep-alive"
-                } 
-                
-                response = requests.get(search_url, headers=headers, timeout=10)
-                
-                if response.status_code == 200: 
-                    # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                    patterns = [
-                        r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                        r'"murl":"(https?://[^"]+)"',
-                        r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                        r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                        r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.findall(pattern, response.text)
-                        if matches and len(matches) > 0:
-                            # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                            for match in matches:
-                                if '.png' in match.lower() or '.svg' in match.lower():
-                                    print(f"[✓] Logo trovato con prefisso: {match}")
-                                    return match
-                            # Se non troviamo PNG o SVG, prendi il primo risultato
-                            print(f"[✓] Logo trovato con prefisso: {matches[0]}")
-                            return matches[0]
-            
-            # Se non riusciamo a identificare le squadre e il prefisso non ha dato risultati, procedi con la ricerca normale
-            print(f"[🔍] Ricerca standard per: {clean_event_name}")
-            
-            
-            # Se non riusciamo a identificare le squadre, procedi con la ricerca normale
-            # Prepara la query di ricerca piÃÂ¹ specifica
-            search_query = urllib.parse.quote(f"{clean_event_name} logo")
-            
-            # Utilizziamo l'API di Bing Image Search con parametri migliorati
-            search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-            
-            headers = { 
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Cache-Control": "max-age=0",
-                "Connection": "keep-alive"
-            } 
-            
-            response = requests.get(search_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200: 
-                # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                patterns = [
-                    r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                    r'"murl":"(https?://[^"]+)"',
-                    r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                    r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                    r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, response.text)
-                    if matches and len(matches) > 0:
-                        # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                        for match in matches:
-                            if '.png' in match.lower() or '.svg' in match.lower():
-                                return match
-                        # Se non troviamo PNG o SVG, prendi il primo risultato
-                        return matches[0]
-                
-                # Metodo alternativo: cerca JSON incorporato nella pagina
-                json_match = re.search(r'var\s+IG\s*=\s*(\{.+?\});\s*', response.text)
-                if json_match:
-                    try:
-                        # Estrai e analizza il JSON
-                        json_str = json_match.group(1)
-                        # Pulisci il JSON se necessario
-                        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+):', r'\1"\2":', json_str)
-                        data = json.loads(json_str)
-                        
-                        # Cerca URL di immagini nel JSON
-                        if 'images' in data and len(data['images']) > 0:
-                            for img in data['images']:
-                                if 'murl' in img:
-                                    return img['murl']
-                    except Exception as e:
-                        print(f"[!] Errore nell'analisi JSON: {e}")
-                
-                print(f"[!] Nessun logo trovato per '{clean_event_name}' con i pattern standard")
-                
-                # Ultimo tentativo: cerca qualsiasi URL di immagine nella pagina
-                any_img = re.search(r'(https?://[^"\']+\.(?:png|jpg|jpeg|svg|webp))', response.text)
-                if any_img:
-                    return any_img.group(1)
-                    
-        except Exception as e: 
-            print(f"[!] Errore nella ricerca del logo per '{event_name}': {e}") 
-        
-        # Se non troviamo nulla, restituiamo None 
+def download_team_logo(logo_url, label, draft_size=None):
+    """
+    Scarica il logo di una squadra e lo decodifica con Pillow (con draft_size i JPEG
+    vengono decodificati direttamente a risoluzione ridotta).
+    Restituisce l'immagine o None se il download fallisce o il contenuto non è un'immagine
+    """
+    from PIL import Image
+    if not logo_url:
         return None
+    try:
+        # Aggiungi un User-Agent simile a un browser
+        logo_headers = {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        }
+        # In streaming il corpo viene scaricato solo se il Content-Type è un'immagine.
+        # response.raw non è seekable, quindi Pillow lo copia comunque in un buffer:
+        # lo streaming non risparmia memoria rispetto a response.content
+        with _SESSION.get(logo_url, headers=logo_headers, timeout=10, stream=True) as response:
+            response.raise_for_status() # Controlla errori HTTP
+            if 'image' in response.headers.get('Content-Type', '').lower():
+                response.raw.decode_content = True
+                img = Image.open(response.raw)
+                if draft_size:
+                    img.draft('RGB', draft_size)
+                # Decodifica prima che la risposta venga chiusa
+                img.load()
+                print(f"[✓] {label.capitalize()} scaricato con successo da: {logo_url}")
+                return img
+            print(f"[!] URL {label} ({logo_url}) non è un'immagine (Content-Type: {response.headers.get('Content-Type')}).")
+    except requests.exceptions.RequestException as e_req:
+        print(f"[!] Errore scaricando {label} ({logo_url}): {e_req}")
+    except Exception as e_pil: # Errore specifico da PIL durante Image.open/load
+        print(f"[!] Errore PIL aprendo {label} ({logo_url}): {e_pil}")
+    return None
+
+@functools.lru_cache(maxsize=1)
+def load_vs_overlay():
+    """
+    Immagine "VS" 100x100 RGBA da sovrapporre ai loghi combinati: vs.png se esiste, altrimenti un testo "VS".
+    Memorizzata: è la stessa per tutti gli eventi e viene solo letta durante il paste
+    """
+    from PIL import Image
+    vs_path = os.path.join(script_dir, "vs.png")
+    if os.path.exists(vs_path):
+        img_vs = Image.open(vs_path)
+        # Converti l'immagine VS in modalità RGBA se non lo è già
+        if img_vs.mode != 'RGBA':
+            img_vs = img_vs.convert('RGBA')
+    else:
+        # Crea un'immagine di testo "VS" se il file non esiste
+        img_vs = Image.new('RGBA', (100, 100), (255, 255, 255, 0))
+        from PIL import ImageDraw, ImageFont
+        draw = ImageDraw.Draw(img_vs)
+        try:
+            font = ImageFont.truetype("arial.ttf", 40)
+        except:
+            font = ImageFont.load_default()
+        draw.text((30, 30), "VS", fill=(255, 0, 0), font=font)
+    return img_vs.resize((100, 100))
 
-    def search_team_logo(team_name):
-        """
-        Funzione dedicata alla ricerca del logo di una singola squadra
-        """
+def combine_team_logos(team1, team2):
+    """
+    Cerca i loghi delle due squadre e li combina in un'unica immagine "VS".
+    Restituisce l'URL/percorso dell'immagine combinata o il logo singolo trovato
+    """
+    from PIL import Image
+    # Le due ricerche sono indipendenti: le eseguiamo in parallelo
+    print(f"[🔍] Ricerca logo per Team 1: {team1}")
+    print(f"[🔍] Ricerca logo per Team 2: {team2}")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        future_logo1 = executor.submit(search_team_logo, team1)
+        future_logo2 = executor.submit(search_team_logo, team2)
+        logo1_url = future_logo1.result()
+        logo2_url = future_logo2.result()
+
+    # Se abbiamo trovato entrambi i loghi, creiamo un'immagine combinata
+    if logo1_url and logo2_url:
+        # Scarica i loghi e l'immagine VS
         try:
-            # Prepara la query di ricerca specifica per la squadra
-            search_query = urllib.parse.quote(f"{team_name} logo")
-            
-            # Utilizziamo l'API di Bing Image Search con parametri migliorati
-            search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-            
-            headers = { 
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Cache-Control": "max-age=0",
-                "Connection": "keep-alive"
-            } 
-            
-            response = requests.get(search_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200: 
-                # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                patterns = [
-                    r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                    r'"murl":"(https?://[^"]+)"',
-                    r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                    r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                    r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, response.text)
-                    if matches and len(matches) > 0:
-                        # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                        for match in matches:
-                            if '.png' in match.lower() or '.svg' in match.lower():
-                                return match
-                        # Se non troviamo PNG o SVG, prendi il primo risultato
-                        return matches[0]
-                
-                # Metodo alternativo: cerca JSON incorporato nella pagina
-                json_match = re.search(r'var\s+IG\s*=\s*(\{.+?\});\s*', response.text)
-                if json_match:
-                    try:
-                        # Estrai e analizza il JSON
-                        json_str = json_match.group(1)
-                        # Pulisci il JSON se necessario
-                        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+):', r'\1"\2":', json_str)
-                        data = json.loads(json_str)
-                        
-                        # Cerca URL di immagini nel JSON
-                        if 'images' in data and len(data['images']) > 0:
-                            for img in data['images']:
-                                if 'murl' in img:
-                                    return img['murl']
-                    except Exception as e:
-                        print(f"[!] Errore nell'analisi JSON: {e}")
-                
-                print(f"[!] Nessun logo trovato per '{team_name}' con i pattern standard")
-                
-                # Ultimo tentativo: cerca qualsiasi URL di immagine nella pagina
-                any_img = re.search(r'(https?://[^"\']+\.(?:png|jpg|jpeg|svg|webp))', response.text)
-                if any_img:
-                    return any_img.group(1)
-                    
+            # Crea la cartella logos se non esiste
+            logos_dir = os.path.join(output_dir, "logos")
+            os.makedirs(logos_dir, exist_ok=True)
+
+            # Verifica se l'immagine combinata esiste giÃÂ  e non ÃÂ¨ obsoleta
+            # Nome file dall'hash delle squadre normalizzate: niente caratteri strani nel path
+            team_key = f"{team1.lower()}_vs_{team2.lower()}".encode('utf-8')
+            relative_logo_path = os.path.join("logos", hashlib.blake2b(team_key, digest_size=8).hexdigest() + ".png")
+            absolute_output_filename = os.path.join(output_dir, relative_logo_path)
+            try:
+                file_age = time.time() - os.stat(absolute_output_filename).st_mtime
+            except OSError:
+                file_age = None  # Il file non esiste ancora
+            if file_age is not None:
+                if file_age <= _COMBINED_LOGO_MAX_AGE:
+                    print(f"[✓] Utilizzo immagine combinata esistente: {absolute_output_filename}")
+
+                    # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
+                    if NOMEGITHUB and NOMEREPO:
+                        github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
+                        print(f"[✓] URL GitHub generato per logo esistente: {github_raw_url}")
+                        return github_raw_url
+                    else:
+                        # Altrimenti restituisci il percorso locale
+                        return absolute_output_filename
+
+            # Dimensione uniforme dei loghi nell'immagine combinata
+            size = (150, 150)
+
+            # Scarica i due loghi in parallelo; un logo non valido invalida anche il suo URL
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                future_img1 = executor.submit(download_team_logo, logo1_url, "logo1", size)
+                future_img2 = executor.submit(download_team_logo, logo2_url, "logo2", size)
+                img1 = future_img1.result()
+                img2 = future_img2.result()
+            if img1 is None:
+                logo1_url = None
+            if img2 is None:
+                logo2_url = None
+
+            # Procedi con la combinazione solo se entrambi i loghi sono stati caricati con successo
+            if not (img1 and img2):
+                print(f"[!] Impossibile caricare entrambi i loghi come immagini valide per la combinazione. Logo1 caricato: {bool(img1)}, Logo2 caricato: {bool(img2)}.")
+                raise ValueError("Uno o entrambi i loghi non sono stati caricati correttamente.") # Questo forzerÃ  l'except sottostante
+
+            # Immagine VS già pronta (caricata e ridimensionata una volta sola per esecuzione)
+            img_vs = load_vs_overlay()
+
+            # Ridimensiona le immagini a dimensioni uniformi
+            img1 = img1.resize(size)
+            img2 = img2.resize(size)
+
+            # Assicurati che tutte le immagini siano in modalitÃÂ  RGBA per supportare la trasparenza
+            if img1.mode != 'RGBA':
+                img1 = img1.convert('RGBA')
+            if img2.mode != 'RGBA':
+                img2 = img2.convert('RGBA')
+
+            # Crea una nuova immagine con spazio per entrambi i loghi e il VS
+            combined_width = 300
+            combined = Image.new('RGBA', (combined_width, 150), (255, 255, 255, 0))
+
+            # Posiziona le immagini con il VS sovrapposto al centro
+            # Posiziona il primo logo a sinistra
+            combined.paste(img1, (0, 0), img1)
+            # Posiziona il secondo logo a destra
+            combined.paste(img2, (combined_width - 150, 0), img2)
+
+            # Posiziona il VS al centro, sovrapposto ai due loghi
+            # (direttamente su combined: la versione senza VS non viene più usata)
+            vs_x = (combined_width - 100) // 2
+            combined.paste(img_vs, (vs_x, 25), img_vs)
+
+            # Salva l'immagine combinata: PNG codificato in memoria, scritto con una sola write
+            # su un file temporaneo e poi rinominato (mai un PNG scritto a metà nella cartella logos)
+            png_buffer = io.BytesIO()
+            combined.save(png_buffer, format='PNG')
+            tmp_filename = absolute_output_filename + ".tmp"
+            with open(tmp_filename, 'wb') as f_png:
+                f_png.write(png_buffer.getbuffer())
+            os.replace(tmp_filename, absolute_output_filename)
+
+            print(f"[✓] Immagine combinata creata: {absolute_output_filename}")
+
+            # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
+            if NOMEGITHUB and NOMEREPO:
+                github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
+                print(f"[✓] URL GitHub generato: {github_raw_url}")
+                return github_raw_url
+            else:
+                # Altrimenti restituisci il percorso assoluto
+                return absolute_output_filename
+
+        except Exception as e:
+            print(f"[!] Errore nella creazione dell'immagine combinata: {e}")
+            # Se fallisce, restituisci solo il primo logo trovato
+            return logo1_url or logo2_url
+
+    # Se non abbiamo trovato entrambi i loghi, restituisci quello che abbiamo
+    return logo1_url or logo2_url
+
+def search_logo_for_event(event_name): 
+    """ 
+    Cerca un logo per l'evento specificato utilizzando un motore di ricerca 
+    event_name è il titolo già senza orario (vedi generate_m3u_from_schedule)
+    Restituisce l'URL dell'immagine trovata o None se non trovata 
+    """ 
+    try: 
+        # Se c'è un ':', la parte prima è il prefisso (es. il campionato) e la ricerca usa solo la parte dopo
+        prefix_name, has_prefix, clean_event_name = event_name.partition(':')
+        clean_event_name = clean_event_name.strip() if has_prefix else event_name
+
+        # Verifica se l'evento contiene "vs" o "-" per identificare le due squadre
+        teams = _VS_SPLIT_RE.split(clean_event_name)
+
+        # Se abbiamo identificato due squadre, cerchiamo i loghi separatamente
+        if len(teams) == 2:
+            team1 = teams[0].strip()
+            team2 = teams[1].strip()
+
+            # Stesse squadre -> stesso logo: lo calcoliamo una sola volta per esecuzione
+            cache_key = (team1.lower(), team2.lower())
+            # Lock per coppia di squadre: eventi diversi in parallelo non scrivono la stessa immagine insieme
+            with _LOGO_KEY_LOCKS.setdefault(cache_key, threading.Lock()):
+                if cache_key not in _LOGO_URL_CACHE:
+                    _LOGO_URL_CACHE[cache_key] = combine_team_logos(team1, team2)
+            return _LOGO_URL_CACHE[cache_key]
+        if has_prefix:
+            # Usa la parte prima dei ":" per la ricerca
+            prefix_name = prefix_name.strip()
+            print(f"[🔍] Tentativo ricerca logo con prefisso: {prefix_name}")
+            logo_url = search_prefix_logo(prefix_name)
+            if logo_url:
+                print(f"[✓] Logo trovato con prefisso: {logo_url}")
+                return logo_url
+
+        # Se non riusciamo a identificare le squadre e il prefisso non ha dato risultati, procedi con la ricerca normale
+        print(f"[🔍] Ricerca standard per: {clean_event_name}")
+        return cached_logo_search(clean_event_name, bing_logo_search, kind="evento")
+
+    except Exception as e: 
+        print(f"[!] Errore nella ricerca del logo per '{event_name}': {e}") 
+
+    # Se non troviamo nulla, restituiamo None 
+    return None
+
+def search_team_logo(team_name):
+    """
+    Logo di una singola squadra: prima teams_logos.json, poi la cache su disco e infine Bing
+    """
+    static_logo = _STATIC_TEAM_LOGOS.get(normalize_team_name(team_name))
+    if static_logo:
+        return static_logo
+    return cached_logo_search(team_name, bing_logo_search)
+
+def search_prefix_logo(prefix_name):
+    """
+    Logo per il prefisso dell'evento (es. il campionato), passando dalla cache su disco
+    """
+    return cached_logo_search(prefix_name, functools.partial(bing_logo_search, patterns_only=True), kind="prefisso")
+
+def bing_logo_search(name, patterns_only=False):
+    """
+    Cerca su Bing Immagini il logo per il nome dato (squadra, evento o prefisso dell'evento).
+    Con patterns_only usa solo i pattern murl, senza JSON incorporato e ricerca generica.
+    Restituisce "" se Bing risponde ma non ci sono loghi, None in caso di errore
+    """
+    try:
+        # Utilizziamo l'API di Bing Image Search con parametri migliorati
+        search_url = bing_image_search_url(f"{name} logo")
+
+        text = fetch_bing_page(search_url)
+
+        if text is not None: 
+            # Pagina troncata o anomala (es. verifica anti-bot): errore, da non memorizzare in cache
+            if len(text) < _BING_MIN_PAGE_LENGTH:
+                return None
+            # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
+            # Preferibilmente PNG o SVG, altrimenti il primo risultato
+            image_url = find_bing_image_url(text)
+            if image_url:
+                return image_url
+            # Nessun murl e pagina "nessun risultato": evita i fallback, è un risultato negativo.
+            # Il controllo viene dopo i pattern perché i marker possono comparire anche
+            # in pagine con risultati validi
+            if patterns_only or any(marker in text for marker in _BING_NO_RESULTS_MARKERS):
+                return ""
+
+            # Metodo alternativo: cerca JSON incorporato nella pagina
+            json_match = _BING_IG_JSON_RE.search(text)
+            if json_match:
+                try:
+                    # Estrai e analizza il JSON
+                    data = parse_bing_ig_json(json_match.group(1))
+
+                    # Cerca URL di immagini nel JSON
+                    if 'images' in data and len(data['images']) > 0:
+                        for img in data['images']:
+                            if 'murl' in img:
+                                return img['murl']
+                except Exception as e:
+                    print(f"[!] Errore nell'analisi JSON: {e}")
+
+            print(f"[!] Nessun logo trovato per '{name}' con i pattern standard")
+
+            # Ultimo tentativo: cerca qualsiasi URL di immagine nella pagina
+            any_img = _ANY_IMG_RE.search(text)
+            if any_img:
+                return any_img.group(1)
+
+            # Ricerca riuscita ma senza risultati: risultato negativo da memorizzare
+            return ""
+
+    except Exception as e: 
+        print(f"[!] Errore nella ricerca del logo per '{name}': {e}") 
+
+    # Se non troviamo nulla, restituiamo None 
+    return None
+
+# Eventi DLHD, comuni ai due generatori eventi_dlhd: lettura del palinsesto e scrittura della playlist
+def clean_category_name(name): 
+    # Rimuove tag html come </span> o simili 
+    return _HTML_TAG_RE.sub('', name).strip()
+
+def clean_tvg_id(tvg_id):
+    """
+    Pulisce il tvg-id rimuovendo caratteri speciali, spazi e convertendo tutto in minuscolo
+    """
+    # Rimuove caratteri speciali comuni mantenendo solo lettere e numeri
+    cleaned = tvg_id.translate(_TVG_ID_TABLE)
+    return cleaned.lower()
+
+def get_stream_from_channel_id(channel_id): 
+    # Restituisce direttamente l'URL .php
+    embed_url = f"{LINK_DADDY}/watch.php?id={channel_id}" 
+    print(f"URL .php per il canale Daddylive {channel_id}.")
+    return embed_url
+
+def extract_channels_from_json(path, world=False):
+    """
+    Legge il palinsesto DLHD e raggruppa per categoria i canali degli eventi di oggi iniziati
+    da meno di 2 ore. Con world usa le parole chiave dei canali esteri e include anche
+    gli eventi di ieri tra le 00:00 e le 04:00
+    """
+    now = datetime.now()  # ora attuale completa (data+ora) 
+    yesterday_date = (now - timedelta(days=1)).date() # Data di ieri
+    # Limiti dei filtri calcolati una volta sola, in minuti/secondi dalla mezzanotte
+    start_filter_minutes, end_filter_minutes = 0, 4 * 60
+    now_seconds = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1_000_000
+
+    with open(path, "rb") as f: 
+        data = _json_loads(f.read()) 
+
+    categorized_channels = {} 
+
+    for date_key, sections in data.items(): 
+        date_part = date_key.split(" - ")[0] 
+        try: 
+            date_obj = parse_schedule_date(date_part) 
         except Exception as e: 
-            print(f"[!] Errore nella ricerca del logo per '{team_name}': {e}") 
-        
-        # Se non troviamo nulla, restituiamo None 
-        return None
-     
-    def get_stream_from_channel_id(channel_id): 
-        # Restituisce direttamente l'URL .php
-        embed_url = f"{LINK_DADDY}/watch.php?id={channel_id}" 
-        print(f"URL .php per il canale Daddylive {channel_id}.")
-        return embed_url
-     
-    # def clean_category_name(name): # Rimossa definizione duplicata
-    #     # Rimuove tag html come </span> o simili
-    #     return re.sub(r'<[^>]+>', '', name).strip()
-     
-    def extract_channels_from_json(path): 
-        keywords = {"italy", "rai", "italia", "it", "uk", "tnt", "usa", "tennis channel", "tennis stream", "la"} 
-        now = datetime.now()  # ora attuale completa (data+ora) 
-        yesterday_date = (now - timedelta(days=1)).date() # Data di ieri
-     
-        with open(path, "r", encoding="utf-8") as f: 
-            data = json.load(f) 
-     
-        categorized_channels = {} 
-     
-        for date_key, sections in data.items(): 
-            date_part = date_key.split(" - ")[0] 
-            try: 
-                date_obj = parser.parse(date_part, fuzzy=True).date() 
-            except Exception as e: 
-                print(f"[!] Errore parsing data '{date_part}': {e}") 
-                continue 
-            
-            # Determina se processare questa data
-            process_this_date = False
+            print(f"[!] Errore parsing data '{date_part}': {e}") 
+            continue 
+
+        # Determina se processare questa data
+        if date_obj == now.date():
             is_yesterday_early_morning_event_check = False
+        elif world and date_obj == yesterday_date:
+            is_yesterday_early_morning_event_check = True # Flag per eventi_dlhd di ieri mattina presto
+        else:
+            # Salta le altre date (per i canali italiani solo oggi, per i world anche ieri)
+            continue
 
-            if date_obj == now.date():
-                process_this_date = True
-            elif date_obj == yesterday_date:
-                process_this_date = True
-                is_yesterday_early_morning_event_check = True # Flag per eventi_dlhd di ieri mattina presto
-            else:
-                # Salta date che non sono nÃ© oggi nÃ© ieri
+        for category_raw, event_items in sections.items(): 
+            category = clean_category_name(category_raw)
+            # Salta la categoria TV Shows
+            if category.lower() == "tv shows":
                 continue
+            if category not in categorized_channels: 
+                categorized_channels[category] = [] 
+
+            for item in event_items: 
+                time_str = item.get("time", "00:00") # Orario originale dal JSON
+                event_title = item.get("event", "Evento") 
+
+                try: 
+                    # Orario evento originale (dal JSON) in minuti dalla mezzanotte
+                    event_minutes = event_time_minutes(time_str)
+
+                    if is_yesterday_early_morning_event_check:
+                        # Filtro per eventi_dlhd di ieri mattina presto (00:00 - 04:00, ora JSON)
+                        if not (start_filter_minutes <= event_minutes <= end_filter_minutes):
+                            # Evento di ieri, ma non nell'intervallo 00:00-04:00 -> salto
+                            continue
+                    else: # eventi_dlhd di oggi
+                        # Controllo: includi solo se l'evento è iniziato da meno di 2 ore
+                        if now_seconds - event_minutes * 60 > 2 * 3600:
+                            # Evento di oggi iniziato da più di 2 ore -> salto
+                            continue
+
+                    time_formatted = f"{event_minutes // 60:02d}:{event_minutes % 60:02d}"
+                except Exception as e_time:
+                    print(f"[!] Errore parsing orario '{time_str}' per evento '{event_title}' in data '{date_key}': {e_time}")
+                    time_formatted = time_str # Fallback
+
+                for ch in item.get("channels", []): 
+                    channel_name = ch.get("channel_name", "") 
+                    channel_id = ch.get("channel_id", "") 
+
+                    if channel_matches(channel_name, world=world):
+                        tvg_name = f"{event_title} ({time_formatted})" 
+                        categorized_channels[category].append({ 
+                            "tvg_name": tvg_name, 
+                            "channel_name": channel_name, 
+                            "channel_id": channel_id,
+                            "event_title": event_title  # Aggiungiamo il titolo dell'evento per la ricerca del logo
+                        }) 
+
+    return categorized_channels 
+
+def generate_m3u_from_schedule(json_file, output_file, world=False):
+    """Genera la playlist degli eventi DLHD (canali world o italiani) con i loghi degli eventi"""
+    categorized_channels = extract_channels_from_json(json_file, world)
+
+    # Righe della playlist, scritte tutte insieme alla fine
+    lines = ["#EXTM3U\n"]
+
+    # Controlla se ci sono eventi_dlhd prima di aggiungere il canale DADDYLIVE
+    has_events = any(channels for channels in categorized_channels.values())
+
+    if has_events:
+        # Aggiungi il canale iniziale/informativo solo se ci sono eventi_dlhd
+        lines.append(f'#EXTINF:-1 tvg-name="DADDYLIVE" group-title="Eventi Live DLHD",DADDYLIVE\n')
+        lines.append("https://example.com.m3u8\n\n")
+    else:
+        print("[ℹ️] Nessun evento trovato, canale DADDYLIVE non aggiunto.")
+
+    # Titoli senza orario (es. "Team A vs Team B (20:00)"), calcolati una volta sola per titolo
+    clean_titles = {
+        event_title: _TIME_SUFFIX_RE.sub('', event_title)
+        for event_title in dict.fromkeys(ch["event_title"] for channels in categorized_channels.values() for ch in channels)}
+    # Ricerca dei loghi in parallelo, una sola volta per titolo pulito
+    clean_event_titles = list(dict.fromkeys(clean_titles.values()))
+    for clean_event_title in clean_event_titles:
+        print(f"[🔍] Ricerca logo per: {clean_event_title}") 
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=LOGO_SEARCH_WORKERS) as executor:
+            event_logos = dict(zip(clean_event_titles, executor.map(search_logo_for_event, clean_event_titles)))
+    finally:
+        # Un solo salvataggio della cache dei loghi per generazione, anche se la ricerca si interrompe
+        save_team_logo_cache()
+
+    # Righe EXTVLCOPT dei canali daddy: gli header sono sempre gli stessi, le prepariamo una volta sola
+    daddy_headers = {"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Mobile/15E148 Safari/604.1", "Referrer": "https://ava.karmakurama.com/", "Origin": "https://ava.karmakurama.com"}
+    daddy_headers_block = ''.join(f'{line}\n' for line in headers_to_extvlcopt(daddy_headers))
+
+    for category, channels in categorized_channels.items(): 
+        if not channels: 
+            continue 
+
+        for ch in channels: 
+            tvg_name = ch["tvg_name"] 
+            channel_id = ch["channel_id"] 
+            event_title = ch["event_title"]  # Otteniamo il titolo dell'evento
+            channel_name = ch["channel_name"]
+
+            # Logo dell'evento, già cercato sopra
+            logo_url = event_logos[clean_titles[event_title]]
+            logo_attribute = f' tvg-logo="{logo_url}"' if logo_url else ''
+
+            try: 
+                # Cerca lo stream .m3u8 nei siti specificati
+                stream = get_stream_from_channel_id(channel_id)
+
+                if stream: 
+                    cleaned_event_id = clean_tvg_id(event_title) # Usa event_title per tvg-id
+                    lines.append(f'#EXTINF:-1 tvg-id="{cleaned_event_id}" tvg-name="{category} | {tvg_name}"{logo_attribute} group-title="Eventi Live DLHD",{category} | {tvg_name}\n')
+                    # Aggiungi EXTHTTP headers per canali daddy (esclusi .php)
+                    if "ava.karmakurama.com" in stream and not stream.endswith('.php'):
+                        lines.append(daddy_headers_block)
+                    lines.append(f'{stream}\n\n')
+                    print(f"[✓] {tvg_name}" + (f" (logo trovato)" if logo_url else " (nessun logo trovato)")) 
+                else: 
+                    print(f"[✗] {tvg_name} - Nessuno stream trovato") 
+            except Exception as e: 
+                print(f"[!] Errore su {tvg_name}: {e}")
+
+    # Scrittura unica a fine generazione, in modo atomico: niente M3U a metà se lo script si interrompe
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(''.join(lines))
+    os.replace(tmp_file, output_file)
+
+# Funzione per il terzo script (eventi_dlhd_m3u8_generator.py)
+def eventi_dlhd_m3u8_generator_world():
+    # Codice del terzo script qui
+    # Aggiungi il codice del tuo script "eventi_dlhd_m3u8_generator.py" in questa funzione.
+    print("Eseguendo l'eventi_dlhd_m3u8_generator.py...")
+    # Il codice che avevi nello script "eventi_dlhd_m3u8_generator.py" va qui, senza modifiche.
+    JSON_FILE = os.path.join(script_dir, "daddyliveSchedule.json")
+    OUTPUT_FILE = os.path.join(output_dir, "eventi_dlhd.m3u")
 
-            if not process_this_date:
-                continue
-     
-            for category_raw, event_items in sections.items(): 
-                category = clean_category_name(category_raw)
-                # Salta la categoria TV Shows
-                if category.lower() == "tv shows":
-                    continue
-                if category not in categorized_channels: 
-                    categorized_channels[category] = [] 
-     
-                for item in event_items: 
-                    time_str = item.get("time", "00:00") # Orario originale dal JSON
-                    event_title = item.get("event", "Evento") 
-     
-                    try: 
-                        # Parse orario evento originale (dal JSON)
-                        original_event_time_obj = datetime.strptime(time_str, "%H:%M").time()
-
-                        # Costruisci datetime completo dell'evento con la sua data originale
-                        # e l'orario originale, poi applica il timedelta(hours=2) (per "correzione timezone?")
-                        # Questo event_datetime_adjusted Ã¨ quello che viene usato per il filtro "meno di 2 ore fa" per oggi
-                        # e per il nome del canale.
-                        event_datetime_adjusted_for_display_and_filter = datetime.combine(date_obj, original_event_time_obj)
-
-                        if is_yesterday_early_morning_event_check:
-                            # Filtro per eventi_dlhd di ieri mattina presto (00:00 - 04:00, ora JSON)
-                            start_filter_time = datetime.strptime("00:00", "%H:%M").time()
-                            end_filter_time = datetime.strptime("04:00", "%H:%M").time()
-                            # Confronta l'orario originale dell'evento
-                            if not (start_filter_time <= original_event_time_obj <= end_filter_time):
-                                # Evento di ieri, ma non nell'intervallo 00:00-04:00 -> salto
-                                continue
-                        else: # eventi_dlhd di oggi
-                            # Controllo: includi solo se l'evento Ã¨ iniziato da meno di 2 ore
-                            # Usa event_datetime_adjusted_for_display_and_filter che ha giÃ  il +2h
-                            if now - event_datetime_adjusted_for_display_and_filter > timedelta(hours=2):
-                                # Evento di oggi iniziato da piÃ¹ di 2 ore -> salto
-                                continue
-                        
-                        time_formatted = event_datetime_adjusted_for_display_and_filter.strftime("%H:%M")
-                    except Exception as e_time:
-                        print(f"[!] Errore parsing orario '{time_str}' per evento '{event_title}' in data '{date_key}': {e_time}")
-                        time_formatted = time_str # Fallback
-     
-                    for ch in item.get("channels", []): 
-                        channel_name = ch.get("channel_name", "") 
-                        channel_id = ch.get("channel_id", "") 
-     
-                        words = set(re.findall(r'\b\w+\b', channel_name.lower())) 
-                        if keywords.intersection(words): 
-                            tvg_name = f"{event_title} ({time_formatted})" 
-                            categorized_channels[category].append({ 
-                                "tvg_name": tvg_name, 
-                                "channel_name": channel_name, 
-                                "channel_id": channel_id,
-                                "event_title": event_title  # Aggiungiamo il titolo dell'evento per la ricerca del logo
-                            }) 
-     
-        return categorized_channels 
-     
-    def generate_m3u_from_schedule(json_file, output_file): 
-        categorized_channels = extract_channels_from_json(json_file) 
-
-        with open(output_file, "w", encoding="utf-8") as f: 
-            f.write("#EXTM3U\n") 
-
-            # Controlla se ci sono eventi_dlhd prima di aggiungere il canale DADDYLIVE
-            has_events = any(channels for channels in categorized_channels.values())
-            
-            if has_events:
-                # Aggiungi il canale iniziale/informativo solo se ci sono eventi_dlhd
-                f.write(f'#EXTINF:-1 tvg-name="DADDYLIVE" group-title="Eventi Live DLHD",DADDYLIVE\n')
-                f.write("https://example.com.m3u8\n\n")
-            else:
-                print("[ℹ️] Nessun evento trovato, canale DADDYLIVE non aggiunto.")
-
-            for category, channels in categorized_channels.items(): 
-                if not channels: 
-                    continue 
-          
-                for ch in channels: 
-                    tvg_name = ch["tvg_name"] 
-                    channel_id = ch["channel_id"] 
-                    event_title = ch["event_title"]  # Otteniamo il titolo dell'evento
-                    channel_name = ch["channel_name"]
-                    
-                    # Cerca un logo per questo evento
-                    # Rimuovi l'orario dal titolo dell'evento prima di cercare il logo
-                    clean_event_title = re.sub(r'\s*\(\d{1,2}:\d{2}\)\s*$', '', event_title)
-                    print(f"[🔍] Ricerca logo per: {clean_event_title}") 
-                    logo_url = search_logo_for_event(clean_event_title)
-                    logo_attribute = f' tvg-logo="{logo_url}"' if logo_url else ''
-     
-                    try: 
-                        # Cerca lo stream .m3u8 nei siti specificati
-                        stream = get_stream_from_channel_id(channel_id)
-                                                    
-                        if stream: 
-                            cleaned_event_id = clean_tvg_id(event_title) # Usa event_title per tvg-id
-                            f.write(f'#EXTINF:-1 tvg-id="{cleaned_event_id}" tvg-name="{category} | {tvg_name}"{logo_attribute} group-title="Eventi Live DLHD",{category} | {tvg_name}\n')
-                            # Aggiungi EXTHTTP headers per canali daddy (esclusi .php)
-                            if "ava.karmakurama.com" in stream and not stream.endswith('.php'):
-                                daddy_headers = {"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Mobile/15E148 Safari/604.1", "Referrer": "https://ava.karmakurama.com/", "Origin": "https://ava.karmakurama.com"}
-                                vlc_opt_lines = headers_to_extvlcopt(daddy_headers)
-                                for line in vlc_opt_lines:
-                                    f.write(f'{line}\n')
-                            f.write(f'{stream}\n\n')
-                            print(f"[✓] {tvg_name}" + (f" (logo trovato)" if logo_url else " (nessun logo trovato)")) 
-                        else: 
-                            print(f"[✗] {tvg_name} - Nessuno stream trovato") 
-                    except Exception as e: 
-                        print(f"[!] Errore su {tvg_name}: {e}") 
-     
     # Esegui la generazione quando la funzione viene chiamata
-    generate_m3u_from_schedule(JSON_FILE, OUTPUT_FILE)
+    generate_m3u_from_schedule(JSON_FILE, OUTPUT_FILE, world=True)
 
 # Funzione per il terzo script (eventi_dlhd_m3u8_generator.py)
 def eventi_dlhd_m3u8_generator():
@@ -948,561 +1120,10 @@ def eventi_dlhd_m3u8_generator():
     # Aggiungi il codice del tuo script "eventi_dlhd_m3u8_generator.py" in questa funzione.
     print("Eseguendo l'eventi_dlhd_m3u8_generator.py...")
     # Il codice che avevi nello script "eventi_dlhd_m3u8_generator.py" va qui, senza modifiche.
-    import json 
-    import re 
-    import requests 
-    from urllib.parse import quote 
-    from datetime import datetime, timedelta 
-    from dateutil import parser 
-    import urllib.parse
-    import os
-    from dotenv import load_dotenv
-    from PIL import Image, ImageDraw, ImageFont
-    import io
-    import urllib.parse # Aggiunto per encoding URL
-    import time
-
-    # Carica le variabili d'ambiente dal file .env
-    load_dotenv()
-    LINK_DADDY = os.getenv("LINK_DADDY", "").strip() or "https://dlhd.dad"
     JSON_FILE = os.path.join(script_dir, "daddyliveSchedule.json") # Cache in scripts
     OUTPUT_FILE = os.path.join(output_dir, "eventi_dlhd.m3u") # Output in main dir
-     
-    HEADERS = { 
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36" 
-    } 
-     
-    HTTP_TIMEOUT = 10 
-    session = requests.Session() 
-    session.headers.update(HEADERS) 
-    # Definisci current_time e three_hours_in_seconds per la logica di caching
-    current_time = time.time()
-    three_hours_in_seconds = 3 * 60 * 60
-    
-    def clean_category_name(name): 
-        # Rimuove tag html come </span> o simili 
-        return re.sub(r'<[^>]+>', '', name).strip()
-        
-    def clean_tvg_id(tvg_id):
-        """
-        Pulisce il tvg-id rimuovendo caratteri speciali, spazi e convertendo tutto in minuscolo.
-        """
-        import re
-        # Rimuove caratteri speciali comuni mantenendo solo lettere e numeri
-        cleaned = re.sub(r'[^a-zA-Z0-9À-ÿ]', '', tvg_id)
-        return cleaned.lower()
-     
-    def search_logo_for_event(event_name): 
-        """ 
-        Cerca un logo per l'evento specificato utilizzando un motore di ricerca 
-        Restituisce l'URL dell'immagine trovata o None se non trovata 
-        """ 
-        try: 
-            # Rimuovi eventuali riferimenti all'orario dal nome dell'evento
-            # Cerca pattern come "Team A vs Team B (20:00)" e rimuovi la parte dell'orario
-            clean_event_name = re.sub(r'\s*\(\d{1,2}:\d{2}\)\s*$', '', event_name)
-            # Se c'è un ':', prendi solo la parte dopo
-            if ':' in clean_event_name:
-                clean_event_name = clean_event_name.split(':', 1)[1].strip()
-            
-            # Verifica se l'evento contiene "vs" o "-" per identificare le due squadre
-            teams = None
-            if " vs " in clean_event_name:
-                teams = clean_event_name.split(" vs ")
-            elif " VS " in clean_event_name:
-                teams = clean_event_name.split(" VS ")
-            elif " VS. " in clean_event_name:
-                teams = clean_event_name.split(" VS. ")
-            elif " vs. " in clean_event_name:
-                teams = clean_event_name.split(" vs. ")
-            
-            # Se abbiamo identificato due squadre, cerchiamo i loghi separatamente
-            if teams and len(teams) == 2:
-                team1 = teams[0].strip()
-                team2 = teams[1].strip()
-                
-                print(f"[🔍] Ricerca logo per Team 1: {team1}")
-                logo1_url = search_team_logo(team1)
-                
-                print(f"[🔍] Ricerca logo per Team 2: {team2}")
-                logo2_url = search_team_logo(team2)
-                
-                # Se abbiamo trovato entrambi i loghi, creiamo un'immagine combinata
-                if logo1_url and logo2_url:
-                    # Scarica i loghi e l'immagine VS
-                    try:
-                        from os.path import exists, getmtime
-                        
-                        # Crea la cartella logos se non esiste
-                        logos_dir = os.path.join(output_dir, "logos")
-                        os.makedirs(logos_dir, exist_ok=True)
-                        
-                        # Verifica se l'immagine combinata esiste giÃÂ  e non ÃÂ¨ obsoleta
-                        relative_logo_path = os.path.join("logos", f"{team1}_vs_{team2}.png")
-                        absolute_output_filename = os.path.join(output_dir, relative_logo_path)
-                        if exists(absolute_output_filename):
-                            file_age = current_time - os.path.getmtime(absolute_output_filename)
-                            if file_age <= three_hours_in_seconds:
-                                print(f"[✓] Utilizzo immagine combinata esistente: {absolute_output_filename}")
-                                
-                                # Carica le variabili d'ambiente per GitHub
-                                NOMEREPO = os.getenv("NOMEREPO", "").strip()
-                                NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-                                
-                                # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
-                                if NOMEGITHUB and NOMEREPO:
-                                    github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
-                                    print(f"[✓] URL GitHub generato per logo esistente: {github_raw_url}")
-                                    return github_raw_url
-                                else:
-                                    # Altrimenti restituisci il percorso locale
-                                    return absolute_output_filename
-                        
-                        # Scarica i loghi
-                        img1, img2 = None, None
-                        
-                        if logo1_url:
-                            try:
-                                # Aggiungi un User-Agent simile a un browser
-                                logo_headers = {
-                                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                                }
-                                response1 = requests.get(logo1_url, headers=logo_headers, timeout=10)
-                                response1.raise_for_status() # Controlla errori HTTP
-                                if 'image' in response1.headers.get('Content-Type', '').lower():
-                                    img1 = Image.open(io.BytesIO(response1.content))
-                                    print(f"[✓] Logo1 scaricato con successo da: {logo1_url}")
-                                else:
-                                    print(f"[!] URL logo1 ({logo1_url}) non è un'immagine (Content-Type: {response1.headers.get('Content-Type')}).")
-                                    logo1_url = None # Invalida URL se non è un'immagine
-                            except requests.exceptions.RequestException as e_req:
-                                print(f"[!] Errore scaricando logo1 ({logo1_url}): {e_req}")
-                                logo1_url = None
-                            except Exception as e_pil: # Errore specifico da PIL durante Image.open
-                                print(f"[!] Errore PIL aprendo logo1 ({logo1_url}): {e_pil}")
-                                logo1_url = None
-                        
-                        if logo2_url:
-                            try:
-                                # Aggiungi un User-Agent simile a un browser
-                                logo_headers = {
-                                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                                }
-                                response2 = requests.get(logo2_url, headers=logo_headers, timeout=10)
-                                response2.raise_for_status() # Controlla errori HTTP
-                                if 'image' in response2.headers.get('Content-Type', '').lower():
-                                    img2 = Image.open(io.BytesIO(response2.content))
-                                    print(f"[✓] Logo2 scaricato con successo da: {logo2_url}")
-                                else:
-                                    print(f"[!] URL logo2 ({logo2_url}) non è un'immagine (Content-Type: {response2.headers.get('Content-Type')}).")
-                                    logo2_url = None # Invalida URL se non è un'immagine
-                            except requests.exceptions.RequestException as e_req:
-                                print(f"[!] Errore scaricando logo2 ({logo2_url}): {e_req}")
-                                logo2_url = None
-                            except Exception as e_pil: # Errore specifico da PIL durante Image.open
-                                print(f"[!] Errore PIL aprendo logo2 ({logo2_url}): {e_pil}")
-                                logo2_url = None
-                        
-                        # Carica l'immagine VS (assicurati che esista nella directory corrente)
-                        vs_path = os.path.join(script_dir, "vs.png")
-                        if exists(vs_path):
-                            img_vs = Image.open(vs_path)
-                            # Converti l'immagine VS in modalitÃÂ  RGBA se non lo ÃÂ¨ giÃÂ 
-                            if img_vs.mode != 'RGBA':
-                                img_vs = img_vs.convert('RGBA')
-                        else:
-                            # Crea un'immagine di testo "VS" se il file non esiste
-                            img_vs = Image.new('RGBA', (100, 100), (255, 255, 255, 0))
-                            from PIL import ImageDraw, ImageFont
-                            draw = ImageDraw.Draw(img_vs)
-                            try:
-                                font = ImageFont.truetype("arial.ttf", 40)
-                            except:
-                                font = ImageFont.load_default()
-                            draw.text((30, 30), "VS", fill=(255, 0, 0), font=font)
-                        
-                        # Procedi con la combinazione solo se entrambi i loghi sono stati caricati con successo
-                        if not (img1 and img2):
-                            print(f"[!] Impossibile caricare entrambi i loghi come immagini valide per la combinazione. Logo1 caricato: {bool(img1)}, Logo2 caricato: {bool(img2)}.")
-                            raise ValueError("Uno o entrambi i loghi non sono stati caricati correttamente.") # Questo forzerÃ  l'except sottostante
-                        
-                        # Ridimensiona le immagini a dimensioni uniformi
-                        size = (150, 150)
-                        img1 = img1.resize(size)
-                        img2 = img2.resize(size)
-                        img_vs = img_vs.resize((100, 100))
-                        
-                        # Assicurati che tutte le immagini siano in modalitÃÂ  RGBA per supportare la trasparenza
-                        if img1.mode != 'RGBA':
-                            img1 = img1.convert('RGBA')
-                        if img2.mode != 'RGBA':
-                            img2 = img2.convert('RGBA')
-                        
-                        # Crea una nuova immagine con spazio per entrambi i loghi e il VS
-                        combined_width = 300
-                        combined = Image.new('RGBA', (combined_width, 150), (255, 255, 255, 0))
-                        
-                        # Posiziona le immagini con il VS sovrapposto al centro
-                        # Posiziona il primo logo a sinistra
-                        combined.paste(img1, (0, 0), img1)
-                        # Posiziona il secondo logo a destra
-                        combined.paste(img2, (combined_width - 150, 0), img2)
-                        
-                        # Posiziona il VS al centro, sovrapposto ai due loghi
-                        vs_x = (combined_width - 100) // 2
-                        
-                        # Crea una copia dell'immagine combinata prima di sovrapporre il VS
-                        # Questo passaggio ÃÂ¨ importante per preservare i dettagli dei loghi sottostanti
-                        combined_with_vs = combined.copy()
-                        combined_with_vs.paste(img_vs, (vs_x, 25), img_vs)
-                        
-                        # Usa l'immagine con VS sovrapposto
-                        combined = combined_with_vs
-                        
-                        # Salva l'immagine combinata
-                        combined.save(absolute_output_filename)
-                        
-                        print(f"[✓] Immagine combinata creata: {absolute_output_filename}")
-                        
-                        # Carica le variabili d'ambiente per GitHub
-                        NOMEREPO = os.getenv("NOMEREPO", "").strip()
-                        NOMEGITHUB = os.getenv("NOMEGITHUB", "").strip()
-                        
-                        # Se le variabili GitHub sono disponibili, restituisci l'URL raw di GitHub
-                        if NOMEGITHUB and NOMEREPO:
-                            github_raw_url = f"https://raw.githubusercontent.com/{NOMEGITHUB}/{NOMEREPO}/main/{relative_logo_path}"
-                            print(f"[✓] URL GitHub generato: {github_raw_url}")
-                            return github_raw_url
-                        else:
-                            # Altrimenti restituisci il percorso assoluto
-                            return absolute_output_filename
-                        
-                    except Exception as e:
-                        print(f"[!] Errore nella creazione dell'immagine combinata: {e}")
-                        # Se fallisce, restituisci solo il primo logo trovato
-                        return logo1_url or logo2_url
-                
-                # Se non abbiamo trovato entrambi i loghi, restituisci quello che abbiamo
-                return logo1_url or logo2_url
-            if ':' in event_name:
-                # Usa la parte prima dei ":" per la ricerca
-                prefix_name = event_name.split(':', 1)[0].strip()
-                print(f"[🔍] Tentativo ricerca logo con prefisso: {prefix_name}")
-                
-                # Prepara la query di ricerca con il prefisso
-                search_query = urllib.parse.quote(f"{prefix_name} logo")
-                
-                # Utilizziamo l'API di Bing Image Search con parametri migliorati
-                search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-                
-                headers = { 
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                    "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                    "Cache-Control": "max-age=0",
-                    "Connection": "keep-alive"
-                } 
-                
-                response = requests.get(search_url, headers=headers, timeout=10)
-                
-                if response.status_code == 200: 
-                    # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                    patterns = [
-                        r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                        r'"murl":"(https?://[^"]+)"',
-                        r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                        r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                        r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.findall(pattern, response.text)
-                        if matches and len(matches) > 0:
-                            # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                            for match in matches:
-                                if '.png' in match.lower() or '.svg' in match.lower():
-                                    print(f"[✓] Logo trovato con prefisso: {match}")
-                                    return match
-                            # Se non troviamo PNG o SVG, prendi il primo risultato
-                            print(f"[✓] Logo trovato con prefisso: {matches[0]}")
-                            return matches[0]
-            
-            # Se non riusciamo a identificare le squadre e il prefisso non ha dato risultati, procedi con la ricerca normale
-            print(f"[🔍] Ricerca standard per: {clean_event_name}")
-            
-            
-            # Se non riusciamo a identificare le squadre, procedi con la ricerca normale
-            # Prepara la query di ricerca piÃÂ¹ specifica
-            search_query = urllib.parse.quote(f"{clean_event_name} logo")
-            
-            # Utilizziamo l'API di Bing Image Search con parametri migliorati
-            search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-            
-            headers = { 
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Cache-Control": "max-age=0",
-                "Connection": "keep-alive"
-            } 
-            
-            response = requests.get(search_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200: 
-                # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                patterns = [
-                    r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                    r'"murl":"(https?://[^"]+)"',
-                    r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                    r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                    r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, response.text)
-                    if matches and len(matches) > 0:
-                        # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                        for match in matches:
-                            if '.png' in match.lower() or '.svg' in match.lower():
-                                return match
-                        # Se non troviamo PNG o SVG, prendi il primo risultato
-                        return matches[0]
-                
-                # Metodo alternativo: cerca JSON incorporato nella pagina
-                json_match = re.search(r'var\s+IG\s*=\s*(\{.+?\});\s*', response.text)
-                if json_match:
-                    try:
-                        # Estrai e analizza il JSON
-                        json_str = json_match.group(1)
-                        # Pulisci il JSON se necessario
-                        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+):', r'\1"\2":', json_str)
-                        data = json.loads(json_str)
-                        
-                        # Cerca URL di immagini nel JSON
-                        if 'images' in data and len(data['images']) > 0:
-                            for img in data['images']:
-                                if 'murl' in img:
-                                    return img['murl']
-                    except Exception as e:
-                        print(f"[!] Errore nell'analisi JSON: {e}")
-                
-                print(f"[!] Nessun logo trovato per '{clean_event_name}' con i pattern standard")
-                
-                # Ultimo tentativo: cerca qualsiasi URL di immagine nella pagina
-                any_img = re.search(r'(https?://[^"\']+\.(?:png|jpg|jpeg|svg|webp))', response.text)
-                if any_img:
-                    return any_img.group(1)
-                    
-        except Exception as e: 
-            print(f"[!] Errore nella ricerca del logo per '{event_name}': {e}") 
-        
-        # Se non troviamo nulla, restituiamo None 
-        return None
 
-    def search_team_logo(team_name):
-        """
-        Funzione dedicata alla ricerca del logo di una singola squadra
-        """
-        try:
-            # Prepara la query di ricerca specifica per la squadra
-            search_query = urllib.parse.quote(f"{team_name} logo")
-            
-            # Utilizziamo l'API di Bing Image Search con parametri migliorati
-            search_url = f"https://www.bing.com/images/search?q={search_query}&qft=+filterui:photo-transparent+filterui:aspect-square&form=IRFLTR"
-            
-            headers = { 
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "it-IT,it;q=0.9,en-US;q=0.8,en;q=0.7",
-                "Cache-Control": "max-age=0",
-                "Connection": "keep-alive"
-            } 
-            
-            response = requests.get(search_url, headers=headers, timeout=10)
-            
-            if response.status_code == 200: 
-                # Metodo 1: Cerca pattern per murl (URL dell'immagine media)
-                patterns = [
-                    r'murl&quot;:&quot;(https?://[^&]+)&quot;',
-                    r'"murl":"(https?://[^"]+)"',
-                    r'"contentUrl":"(https?://[^"]+\.(?:png|jpg|jpeg|svg))"',
-                    r'<img[^>]+src="(https?://[^"]+\.(?:png|jpg|jpeg|svg))[^>]+class="mimg"',
-                    r'<a[^>]+class="iusc"[^>]+m=\'{"[^"]*":"[^"]*","[^"]*":"(https?://[^"]+)"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, response.text)
-                    if matches and len(matches) > 0:
-                        # Prendi il primo risultato che sembra un logo (preferibilmente PNG o SVG)
-                        for match in matches:
-                            if '.png' in match.lower() or '.svg' in match.lower():
-                                return match
-                        # Se non troviamo PNG o SVG, prendi il primo risultato
-                        return matches[0]
-                
-                # Metodo alternativo: cerca JSON incorporato nella pagina
-                json_match = re.search(r'var\s+IG\s*=\s*(\{.+?\});\s*', response.text)
-                if json_match:
-                    try:
-                        # Estrai e analizza il JSON
-                        json_str = json_match.group(1)
-                        # Pulisci il JSON se necessario
-                        json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+):', r'\1"\2":', json_str)
-                        data = json.loads(json_str)
-                        
-                        # Cerca URL di immagini nel JSON
-                        if 'images' in data and len(data['images']) > 0:
-                            for img in data['images']:
-                                if 'murl' in img:
-                                    return img['murl']
-                    except Exception as e:
-                        print(f"[!] Errore nell'analisi JSON: {e}")
-                
-                print(f"[!] Nessun logo trovato per '{team_name}' con i pattern standard")
-                
-                # Ultimo tentativo: cerca qualsiasi URL di immagine nella pagina
-                any_img = re.search(r'(https?://[^"\']+\.(?:png|jpg|jpeg|svg|webp))', response.text)
-                if any_img:
-                    return any_img.group(1)
-                    
-        except Exception as e: 
-            print(f"[!] Errore nella ricerca del logo per '{team_name}': {e}") 
-        
-        # Se non troviamo nulla, restituiamo None 
-        return None
-     
-    def get_stream_from_channel_id(channel_id): 
-        # Restituisce direttamente l'URL .php
-        embed_url = f"{LINK_DADDY}/watch.php?id={channel_id}" 
-        print(f"URL .php per il canale Daddylive {channel_id}.")
-        return embed_url
-     
-    def clean_category_name(name): 
-        # Rimuove tag html come </span> o simili 
-        return re.sub(r'<[^>]+>', '', name).strip() 
-     
-    def extract_channels_from_json(path): 
-        keywords = {"italy", "rai", "italia", "it"} 
-        now = datetime.now()  # ora attuale completa (data+ora) 
-        yesterday_date = (now - timedelta(days=1)).date() # Data di ieri
-     
-        with open(path, "r", encoding="utf-8") as f: 
-            data = json.load(f) 
-     
-        categorized_channels = {} 
-     
-        for date_key, sections in data.items(): 
-            date_part = date_key.split(" - ")[0] 
-            try: 
-                date_obj = parser.parse(date_part, fuzzy=True).date() 
-            except Exception as e: 
-                print(f"[!] Errore parsing data '{date_part}': {e}") 
-                continue 
-     
-            # filtro solo per eventi_dlhd del giorno corrente 
-            if date_obj != now.date(): 
-                continue 
-     
-            date_str = date_obj.strftime("%Y-%m-%d") 
-     
-            for category_raw, event_items in sections.items(): 
-                category = clean_category_name(category_raw)
-                # Salta la categoria TV Shows
-                if category.lower() == "tv shows":
-                    continue
-                if category not in categorized_channels: 
-                    categorized_channels[category] = [] 
-     
-                for item in event_items: 
-                    time_str = item.get("time", "00:00") 
-                    try: 
-                        # Parse orario evento 
-                        time_obj = datetime.strptime(time_str, "%H:%M")
-     
-                        # crea datetime completo con data evento e orario evento 
-                        event_datetime = datetime.combine(date_obj, time_obj.time()) 
-     
-                        # Controllo: includi solo se l'evento Ã¨ iniziato da meno di 2 ore 
-                        if now - event_datetime > timedelta(hours=2): 
-                            # Evento iniziato da piÃ¹ di 2 ore -> salto 
-                            continue 
-     
-                        time_formatted = time_obj.strftime("%H:%M") 
-                    except Exception: 
-                        time_formatted = time_str 
-     
-                    event_title = item.get("event", "Evento") 
-     
-                    for ch in item.get("channels", []): 
-                        channel_name = ch.get("channel_name", "") 
-                        channel_id = ch.get("channel_id", "") 
-     
-                        words = set(re.findall(r'\b\w+\b', channel_name.lower())) 
-                        if keywords.intersection(words): 
-                            tvg_name = f"{event_title} ({time_formatted})" 
-                            categorized_channels[category].append({ 
-                                "tvg_name": tvg_name, 
-                                "channel_name": channel_name, 
-                                "channel_id": channel_id,
-                                "event_title": event_title  # Aggiungiamo il titolo dell'evento per la ricerca del logo
-                            }) 
-     
-        return categorized_channels 
-     
-    def generate_m3u_from_schedule(json_file, output_file): 
-        categorized_channels = extract_channels_from_json(json_file) 
-
-        with open(output_file, "w", encoding="utf-8") as f: 
-            f.write("#EXTM3U\n") 
-
-            # Controlla se ci sono eventi_dlhd prima di aggiungere il canale DADDYLIVE
-            has_events = any(channels for channels in categorized_channels.values())
-            
-            if has_events:
-                # Aggiungi il canale iniziale/informativo solo se ci sono eventi_dlhd
-                f.write(f'#EXTINF:-1 tvg-name="DADDYLIVE" group-title="Eventi Live DLHD",DADDYLIVE\n')
-                f.write("https://example.com.m3u8\n\n")
-            else:
-                print("[ℹ️] Nessun evento trovato, canale DADDYLIVE non aggiunto.")
-
-            for category, channels in categorized_channels.items(): 
-                if not channels: 
-                    continue 
-          
-                for ch in channels: 
-                    tvg_name = ch["tvg_name"] 
-                    channel_id = ch["channel_id"] 
-                    event_title = ch["event_title"]  # Otteniamo il titolo dell'evento
-                    channel_name = ch["channel_name"]
-                    
-                    # Cerca un logo per questo evento
-                    # Rimuovi l'orario dal titolo dell'evento prima di cercare il logo
-                    clean_event_title = re.sub(r'\s*\(\d{1,2}:\d{2}\)\s*$', '', event_title)
-                    print(f"[🔍] Ricerca logo per: {clean_event_title}") 
-                    logo_url = search_logo_for_event(clean_event_title)
-                    logo_attribute = f' tvg-logo="{logo_url}"' if logo_url else ''
-     
-                    try: 
-                        # Cerca lo stream .m3u8 nei siti specificati
-                        stream = get_stream_from_channel_id(channel_id)
-
-                        if stream: 
-                            cleaned_event_id = clean_tvg_id(event_title) # Usa event_title per tvg-id
-                            f.write(f'#EXTINF:-1 tvg-id="{cleaned_event_id}" tvg-name="{category} | {tvg_name}"{logo_attribute} group-title="Eventi Live DLHD",{category} | {tvg_name}\n')
-                            # Aggiungi EXTHTTP headers per canali daddy (esclusi .php)
-                            if "ava.karmakurama.com" in stream and not stream.endswith('.php'):
-                                daddy_headers = {"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Mobile/15E148 Safari/604.1", "Referrer": "https://ava.karmakurama.com/", "Origin": "https://ava.karmakurama.com"}
-                                vlc_opt_lines = headers_to_extvlcopt(daddy_headers)
-                                for line in vlc_opt_lines:
-                                    f.write(f'{line}\n')
-                            f.write(f'{stream}\n\n')
-                            print(f"[✓] {tvg_name}" + (f" (logo trovato)" if logo_url else " (nessun logo trovato)")) 
-                        else: 
-                            print(f"[✗] {tvg_name} - Nessuno stream trovato") 
-                    except Exception as e: 
-                        print(f"[!] Errore su {tvg_name}: {e}") 
-     
-    if __name__ == "__main__": 
+    if __name__ == "__main__":
         generate_m3u_from_schedule(JSON_FILE, OUTPUT_FILE)
 
 # Funzione per il quarto script (schedule_extractor.py)
@@ -1517,12 +1138,7 @@ def schedule_extractor():
     from datetime import datetime
     import re
     from bs4 import BeautifulSoup
-    from dotenv import load_dotenv
     
-    # Carica le variabili d'ambiente dal file .env
-    load_dotenv()
-    
-    LINK_DADDY = os.getenv("LINK_DADDY", "").strip() or "https://dlhd.dad"
     FLARESOLVERR_URL = os.getenv("FLARESOLVERR_URL")
     if FLARESOLVERR_URL:
         FLARESOLVERR_URL = FLARESOLVERR_URL.strip()
@@ -1532,7 +1148,7 @@ def schedule_extractor():
     
     def html_to_json(html_content):
         """Converte il contenuto HTML della programmazione in formato JSON."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml') # parser in C, già installato dal workflow
         result = {}
         
         # Cerca il div principale con il nuovo ID
@@ -1592,7 +1208,7 @@ def schedule_extractor():
                     for link in channels_div.find_all('a', href=True):
                         href = link.get('href', '')
                         # Estrae l'id da watch.php?id=XXX
-                        channel_id_match = re.search(r'id=(\d+)', href)
+                        channel_id_match = _CHANNEL_ID_RE.search(href)
                         if channel_id_match:
                             channel_id = channel_id_match.group(1)
                             channel_name = link.get('title', link.text.strip())
@@ -1606,28 +1222,6 @@ def schedule_extractor():
         
         return result
     
-    def modify_json_file(json_file_path):
-        with open(json_file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        current_month = datetime.now().strftime("%B")
-    
-        # Questa logica non è più necessaria con la nuova struttura HTML
-        # che fornisce già la data completa.
-        # for date in list(data.keys()):
-        #     match = re.match(r"(\w+\s\d+)(st|nd|rd|th)\s(\d{4})", date)
-        #     if match:
-        #         day_part = match.group(1)
-        #         suffix = match.group(2)
-        #         year_part = match.group(3)
-        #         new_date = f"{day_part}{suffix} {current_month} {year_part}"
-        #         data[new_date] = data.pop(date)
-    
-        with open(json_file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-        
-        print(f"File JSON modificato e salvato in {json_file_path}")
-        
     def extract_schedule_container():
         import requests
         from bs4 import BeautifulSoup
@@ -1667,7 +1261,7 @@ def schedule_extractor():
             print("✓ Cloudflare bypassato con FlareSolverr!")
             
             # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, 'lxml')
             schedule_div = soup.find('div', id='schedule')
             
             if not schedule_div:
@@ -1679,11 +1273,10 @@ def schedule_extractor():
             print("✓ Schedule estratto!")
             json_data = html_to_json(str(schedule_div))
             
-            with open(json_output, "w", encoding="utf-8") as f:
-                json.dump(json_data, f, indent=4)
+            with open(json_output, "wb") as f:
+                f.write(_json_dumps(json_data, indent=True))
             
             print(f"✓ Salvato in {json_output}")
-            modify_json_file(json_output)
             return True
             
         except Exception as e:
@@ -1739,13 +1332,14 @@ def italy_channels():
     def clean_channel_name(name):
         """Rimuove i suffissi .a, .b, .c dal nome del canale"""
         # Rimuove .a, .b, .c alla fine del nome (con o senza spazi prima)
-        cleaned_name = re.sub(r'\s*\.(a|b|c|s|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|t|u|v|w|x|y|z)\s*$', '', name, flags=re.IGNORECASE)
+        cleaned_name = _CHANNEL_SUFFIX_RE.sub('', name)
         return cleaned_name.strip()
 
     def normalize_channel_name(name):
-        name = re.sub(r"\s+", "", name.strip().lower())
-        name = re.sub(r"\.it\b", "", name)
-        name = re.sub(r"hd|fullhd", "", name)
+        # split()/join toglie tutti gli spazi (stessi caratteri di \s) senza passare dal motore regex
+        name = ''.join(name.lower().split())
+        name = _DOT_IT_RE.sub("", name)
+        name = _HD_RE.sub("", name)
         return name
 
     def fetch_logos():
@@ -2104,20 +1698,24 @@ def italy_channels():
         "Altro": ["real time"]
     }
 
+    # Per le parole normali la regex con word boundaries viene compilata una sola volta;
+    # le parole con caratteri speciali (pattern None) usano una ricerca diretta
+    CATEGORY_MATCHERS = [
+        (category, [(word, None) if any(char in word for char in ['!', '&', '+', '-'])
+                    else (word, re.compile(r'\b' + re.escape(word) + r'\b'))
+                    for word in words])
+        for category, words in CATEGORY_KEYWORDS.items()
+    ]
+
     def classify_channel(name):
         name_lower = name.lower()
-        for category, words in CATEGORY_KEYWORDS.items():
-            for word in words:
-                # Gestione speciale per parole con caratteri speciali
-                if any(char in word for char in ['!', '&', '+', '-']):
-                    # Per parole con caratteri speciali, usa una ricerca diretta
+        for category, matchers in CATEGORY_MATCHERS:
+            for word, pattern in matchers:
+                if pattern is None:
                     if word in name_lower:
                         return category
-                else:
-                    # Per parole normali, usa word boundaries
-                    pattern = r'\b' + re.escape(word) + r'\b'
-                    if re.search(pattern, name_lower):
-                        return category
+                elif pattern.search(name_lower):
+                    return category
         return "Altro"
 
     def get_channels():
@@ -2216,57 +1814,61 @@ def italy_channels():
                         "tvg_id": tvg_id         # TVG-ID trovato con nome modificato
                     })
 
-        # Salva nel file M3U
-        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
-            f.write("#EXTM3U\n")
-            for category, channel_list in channels_by_category.items():
-                channel_list.sort(key=lambda x: x["name"].lower())
+        # Righe EXTVLCOPT dei canali daddy, uguali per tutti: preparate una volta sola
+        daddy_headers = {"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Mobile/15E148 Safari/604.1", "Referrer": "https://ava.karmakurama.com/", "Origin": "https://ava.karmakurama.com"}
+        daddy_headers_block = ''.join(f'{line}\n' for line in headers_to_extvlcopt(daddy_headers))
+
+        # Righe della playlist in una lista, scritte con una sola write alla fine
+        lines = ["#EXTM3U\n"]
+        for category, channel_list in channels_by_category.items():
+            channel_list.sort(key=lambda x: x["name"].lower())
+            
+            # Gestione dei canali duplicati (aggiungi suffisso numerico)
+            name_count = {}
+            url_by_name = {}
+            # Prima passata: conta le occorrenze dei nomi e memorizza gli URL
+            for ch in channel_list:
+                name = ch["name"]
+                url = ch["url"]
+                if name not in name_count:
+                    name_count[name] = 1
+                    url_by_name[name] = [url]
+                else:
+                    name_count[name] += 1
+                    url_by_name[name].append(url)
+
+            # Seconda passata: rinomina i canali duplicati con URL diversi
+            for ch in channel_list:
+                name = ch["name"]
+                url = ch["url"]
+                # Se ci sono più canali con lo stesso nome ma URL diversi
+                if name_count[name] > 1 and len(set(url_by_name[name])) > 1:
+                    # Trova l'indice di questo URL nell'elenco degli URL per questo nome
+                    idx = url_by_name[name].index(url) + 1
+                    # Modifica il nome solo se non è già stato modificato
+                    if not name.endswith(f"({idx})"):
+                        ch["name"] = f"{name} ({idx})"
+
+            lines.append(f"\n# {category.upper()}\n")
+            for ch in channel_list:
+                name = ch["name"]
+                url = ch["url"]
                 
-                # Gestione dei canali duplicati (aggiungi suffisso numerico)
-                name_count = {}
-                url_by_name = {}
-                # Prima passata: conta le occorrenze dei nomi e memorizza gli URL
-                for ch in channel_list:
-                    name = ch["name"]
-                    url = ch["url"]
-                    if name not in name_count:
-                        name_count[name] = 1
-                        url_by_name[name] = [url]
-                    else:
-                        name_count[name] += 1
-                        url_by_name[name].append(url)
-
-                # Seconda passata: rinomina i canali duplicati con URL diversi
-                for ch in channel_list:
-                    name = ch["name"]
-                    url = ch["url"]
-                    # Se ci sono più canali con lo stesso nome ma URL diversi
-                    if name_count[name] > 1 and len(set(url_by_name[name])) > 1:
-                        # Trova l'indice di questo URL nell'elenco degli URL per questo nome
-                        idx = url_by_name[name].index(url) + 1
-                        # Modifica il nome solo se non è già stato modificato
-                        if not name.endswith(f"({idx})"):
-                            ch["name"] = f"{name} ({idx})"
+                # Usa logo e tvg_id pre-calcolati
+                logo = ch.get("logo", "")
+                tvg_id = ch.get("tvg_id", "")
+                
+                lines.append(f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-logo="{logo}" group-title="{category}",{name}\n')
+                
+                # Aggiungi EXTHTTP headers per canali daddy (esclusi .php)
+                if "ava.karmakurama.com" in url and not url.endswith('.php'):
+                    lines.append(daddy_headers_block)
+                
+                lines.append(f'{url}\n')
 
-                f.write(f"\n# {category.upper()}\n")
-                for ch in channel_list:
-                    name = ch["name"]
-                    url = ch["url"]
-                    
-                    # Usa logo e tvg_id pre-calcolati
-                    logo = ch.get("logo", "")
-                    tvg_id = ch.get("tvg_id", "")
-                    
-                    f.write(f'#EXTINF:-1 tvg-id="{tvg_id}" tvg-logo="{logo}" group-title="{category}",{name}\n')
-                    
-                    # Aggiungi EXTHTTP headers per canali daddy (esclusi .php)
-                    if "ava.karmakurama.com" in url and not url.endswith('.php'):
-                        daddy_headers = {"User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Mobile/15E148 Safari/604.1", "Referrer": "https://ava.karmakurama.com/", "Origin": "https://ava.karmakurama.com"}
-                        vlc_opt_lines = headers_to_extvlcopt(daddy_headers)
-                        for line in vlc_opt_lines:
-                            f.write(f'{line}\n')
-                    
-                    f.write(f'{url}\n')
+        # Salva nel file M3U
+        with open(os.path.join(output_dir, filename), "w", encoding="utf-8") as f:
+            f.write(''.join(lines))
 
         print(f"Playlist M3U salvata in: {os.path.join(output_dir, filename)}")
         print(f"Totale canali Vavoo: {len(channels)}")
@@ -2328,7 +1930,7 @@ def world_channels_generator():
     def clean_channel_name(name):
         """Rimuove i suffissi .a, .b, .c dal nome del canale"""
         # Rimuove .a, .b, .c alla fine del nome (con o senza spazi prima)
-        cleaned_name = re.sub(r'\s*\.(a|b|c|s|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|t|u|v|w|x|y|z)\s*$', '', name, flags=re.IGNORECASE)
+        cleaned_name = _CHANNEL_SUFFIX_RE.sub('', name)
         return cleaned_name.strip()
     
     def get_channels():
@@ -2451,6 +2053,8 @@ def sportsonline():
     
         print("\n2. Cerco i canali in lingua italiana...")
         italian_channels = get_italian_channels(lines)
+        # Percorsi delle pagine dei canali italiani, costruiti una volta sola invece che per ogni riga
+        italian_channel_pages = tuple(dict.fromkeys(f"/{channel}.php" for channel in italian_channels))
     
         playlist_entries = []
     
@@ -2497,7 +2101,7 @@ def sportsonline():
                 event_info = parts[0].strip()
                 page_url = parts[1].strip()
     
-                is_italian_event = any(f"/{channel}.php" in page_url for channel in italian_channels)
+                is_italian_event = any(channel_page in page_url for channel_page in italian_channel_pages)
     
                 if is_italian_event:
                     print(f"\n[EVENTO] Trovato evento italiano: '{event_info}'")
@@ -2509,11 +2113,9 @@ def sportsonline():
                         
                         # --- Aggiungi 1 ora all'orario ---
                         try:
-                            # Converte la stringa dell'orario in un oggetto datetime
-                            original_time = datetime.datetime.strptime(time_str_original.strip(), '%H:%M')
-                            # Aggiunge un'ora
-                            new_time = original_time + datetime.timedelta(hours=1)
-                            time_str = new_time.strftime('%H:%M')
+                            # Orario in minuti dalla mezzanotte (senza strptime), più un'ora, riportato nelle 24 ore
+                            new_minutes = (event_time_minutes(time_str_original.strip()) + 60) % (24 * 60)
+                            time_str = f"{new_minutes // 60:02d}:{new_minutes % 60:02d}"
                         except ValueError:
                             time_str = time_str_original.strip() # Usa l'orario originale se il formato non è valido
                         event_name = f"{name_only.strip()} {time_str}"
@@ -2557,8 +2159,6 @@ def search_m3u8_in_sites(channel_id, is_tennis=False, session=None):
     """
     Cerca i file .m3u8 nei siti specificati per i canali daddy e tennis
     """
-    # Carica la variabile d'ambiente LINK_DADDY
-    LINK_DADDY = os.getenv("LINK_DADDY", "").strip() or "https://dlhd.dad"
     # Restituisce direttamente l'URL .php come richiesto
     embed_url = f"{LINK_DADDY}/watch.php?id={channel_id}"
     print(f"URL .php per il canale Daddylive {channel_id}: {embed_url}")
@@ -2584,8 +2184,7 @@ def remover_cache():
 def main():
     # load_daddy_cache()  # RIMOSSO: non più definita né necessaria
     try:
-        canali_daddy_flag = os.getenv("CANALI_DADDY", "no").strip().lower()
-        if canali_daddy_flag == "si":
+        if CANALI_DADDY:
             try:
                 schedule_success = schedule_extractor()
             except Exception as e:
@@ -2597,7 +2196,7 @@ def main():
 
         # eventi_dlhd M3U8
         try:
-            if canali_daddy_flag == "si":
+            if CANALI_DADDY:
                 if eventi_dlhd_en == "si":
                     eventi_dlhd_m3u8_generator_world()
                 else: